@@ -1,5 +1,213 @@
 from __future__ import annotations
+import contextlib
+import contextvars
+import decimal
 import math
+import numbers
+import operator
+import re
+import sys
+import threading
+from collections import OrderedDict, deque
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, BinaryIO
+
+if TYPE_CHECKING:
+    import argparse
+
+_active_cache:contextvars.ContextVar[OperationCache|None]=contextvars.ContextVar('fraction_cache',default=None)
+_exit_tokens:contextvars.ContextVar[tuple[contextvars.Token,...]]=contextvars.ContextVar('fraction_exit_tokens',default=())
+_active_bound:contextvars.ContextVar[BoundedDenominator|None]=contextvars.ContextVar('fraction_bound',default=None)
+_CONVERTERS:dict[type,Callable[[object],tuple[int,int]]|type|bool]={}
+_HASH_MODULUS=sys.hash_info.modulus
+_HASH_INF=sys.hash_info.inf
+_ROUNDING_MODES=(decimal.ROUND_HALF_EVEN,decimal.ROUND_HALF_UP,decimal.ROUND_HALF_DOWN,
+                 decimal.ROUND_UP,decimal.ROUND_DOWN,decimal.ROUND_CEILING,decimal.ROUND_FLOOR)
+_FORMAT_SPEC=re.compile(r'(?:(?P<fill>.)?(?P<align>[<>=^]))?(?P<sign>[-+ ]?)(?P<z>z?)(?P<alt>#?)'
+                        r'(?P<zero>0?)(?P<width>\d*)(?P<grouping>[,_]?)(?:\.(?P<prec>\d+))?(?P<type>[eEfF%]?)',
+                        re.DOTALL)
+
+def _enter_context(var:contextvars.ContextVar,value:object)->None:
+    '''
+    Set a context variable and push the token needed to undo it.
+    The token stack is itself a context variable, so every thread or task keeps the tokens
+    it created and exits never pick up a token from another context.
+    '''
+    _exit_tokens.set(_exit_tokens.get()+(var.set(value),))
+
+def _exit_context(var:contextvars.ContextVar)->None:
+    '''
+    Undo the most recent _enter_context() of var in the current context.
+    Tokens of other variables stay on the stack, so a cache and a bound mode can be exited
+    in any order without resetting each other.
+    '''
+    stack=_exit_tokens.get()
+    for i in range(len(stack)-1,-1,-1):
+        if stack[i].var is var:
+            _exit_tokens.set(stack[:i]+stack[i+1:])
+            var.reset(stack[i])
+            return
+    raise RuntimeError("Exiting {} without a matching enter in this context".format(var.name))
+
+def _int_pair(x:int)->tuple[int,int]:
+    '''
+    Return (x, 1) for int subclasses such as bool.
+    '''
+    return int(x),1
+
+def _rational_pair(x:numbers.Rational)->tuple[int,int]:
+    '''
+    Return the exact pair of any numbers.Rational, e.g. fractions.Fraction or numpy.int64.
+    '''
+    return int(x.numerator),int(x.denominator)
+
+def _decimal_pair(x:decimal.Decimal)->tuple[int,int]:
+    '''
+    Return the exact pair of a finite Decimal without going through float.
+    Raises:
+        ValueError: If the Decimal is infinite or NaN.
+    '''
+    if not x.is_finite():
+        raise ValueError("Cannot use non-finite Decimal {} as a Fraction".format(x))
+    return x.as_integer_ratio()
+
+def _converter(tp:type)->Callable[[object],tuple[int,int]]|type|bool:
+    '''
+    Return how the operators should treat an operand of type tp.
+    The answer is a function returning an exact (numerator, denominator) pair, float for
+    operands that keep float semantics, or False for unsupported types. The isinstance
+    checks run once per type; later lookups are a single dict access.
+    '''
+    try:
+        return _CONVERTERS[tp]
+    except KeyError:
+        pass
+    if issubclass(tp,Fraction):
+        convert=Fraction.to_tuple
+    elif issubclass(tp,int):
+        convert=_int_pair
+    elif issubclass(tp,float):
+        convert=float
+    elif issubclass(tp,numbers.Rational):
+        convert=_rational_pair
+    elif issubclass(tp,decimal.Decimal):
+        convert=_decimal_pair
+    else:
+        convert=False
+    _CONVERTERS[tp]=convert
+    return convert
+
+def _add_pairs(n1:int,d1:int,n2:int,d2:int)->tuple[int,int]:
+    '''
+    Add n1/d1 and n2/d2 over the LCM of the denominators, without reducing the numerator.
+    Equal denominators cost a single addition.
+    '''
+    if d1==d2:
+        return n1+n2,d1
+    g=math.gcd(d1,d2)
+    return n1*(d2//g)+n2*(d1//g),d1//g*d2
+
+def _round_div(n:int,d:int,rounding:str)->int:
+    '''
+    Divide integer n by positive integer d and round the quotient to an integer.
+    Rounding uses the same mode names as the decimal module (e.g. decimal.ROUND_HALF_EVEN).
+    Raises:
+        ValueError: If rounding is not a supported mode.
+    '''
+    if rounding not in _ROUNDING_MODES:
+        raise ValueError("Unsupported rounding mode: {}".format(rounding))
+    q,r=divmod(n,d)
+    if r==0 or rounding==decimal.ROUND_FLOOR:
+        return q
+    if rounding==decimal.ROUND_CEILING:
+        return q+1
+    if rounding==decimal.ROUND_DOWN:
+        return q if n>=0 else q+1
+    if rounding==decimal.ROUND_UP:
+        return q+1 if n>=0 else q
+    if 2*r<d:
+        return q
+    if 2*r>d:
+        return q+1
+    if rounding==decimal.ROUND_HALF_UP:
+        return q+1 if n>=0 else q
+    if rounding==decimal.ROUND_HALF_DOWN:
+        return q if n>=0 else q+1
+    return q if q%2==0 else q+1
+
+_DIGIT_CHUNK=1000
+_DIGIT_SCALE=10**_DIGIT_CHUNK
+
+def _decimal_digits(n:int,width:int=0)->str:
+    '''
+    Return the decimal digits of a non-negative int, zero-padded on the left to width.
+    Digits are produced in blocks of _DIGIT_CHUNK with divmod by 10**_DIGIT_CHUNK, so no
+    single str(int) call goes over Python's int-to-str digit limit.
+    '''
+    if n<_DIGIT_SCALE:
+        return str(n).rjust(width,'0')
+    blocks=[]
+    while n>=_DIGIT_SCALE:
+        n,block=divmod(n,_DIGIT_SCALE)
+        blocks.append(str(block).rjust(_DIGIT_CHUNK,'0'))
+    blocks.append(str(n))
+    return ''.join(reversed(blocks)).rjust(width,'0')
+
+def _factorize(n:int,bound:int)->tuple[dict[int,int],int]:
+    '''
+    Split a positive integer into its prime factors up to bound and the rest.
+    Uses trial division, which stops at bound (or sqrt(n)), so the cost is at most O(bound).
+    Returns:
+        tuple: ({prime: exponent} for the primes found, cofactor with no prime factor <= bound)
+    '''
+    factors:dict[int,int]={}
+    p=2
+    while p<=bound and p*p<=n:
+        while n%p==0:
+            factors[p]=factors.get(p,0)+1
+            n//=p
+        p+=1 if p==2 else 2
+    if 1<n<=bound:
+        factors[n]=factors.get(n,0)+1
+        n=1
+    return factors,n
+
+def _multiplicative_order(a:int,m:int,limit:int)->int:
+    '''
+    Return the smallest k>0 with a**k = 1 (mod m), for a coprime to m.
+    For the part of m made of primes up to limit+1 the order is found from the Carmichael
+    function, built from the factorization and reduced one prime factor at a time. For the
+    cofactor left over (primes above limit+1) it is found by stepping through the powers
+    of a, at most limit of them.
+    Raises:
+        ValueError: If the order is greater than limit.
+    '''
+    too_long=ValueError("Repeating period is longer than {} digits".format(limit))
+    factors,rest=_factorize(m,limit+1)
+    order=1
+    for p,e in factors.items():
+        lam=p**(e-1)*(p-1)
+        if p==2 and e>=3:
+            lam//=2
+        order=order*lam//math.gcd(order,lam)
+    smooth=m//rest
+    for q in _factorize(order,limit+1)[0]:
+        while order%q==0 and pow(a,order//q,smooth)==1:
+            order//=q
+    if order>limit:
+        raise too_long
+    if rest>1:
+        x,k=a%rest,1
+        while x!=1:
+            if k>=limit:
+                raise too_long
+            x=x*a%rest
+            k+=1
+        order=order*k//math.gcd(order,k)
+        if order>limit:
+            raise too_long
+    return order
+
 class Fraction:
     '''
     Created by: Vaibhav Kandhare
@@ -15,7 +223,12 @@ class Fraction:
         Initialize a Fraction object.
         Accepts numerator and denominator as int, float, or Fraction.
         Automatically converts float to Fraction and simplifies the result.
+        Any numbers.Rational or decimal.Decimal is converted exactly first.
         '''
+        if not isinstance(n,(Fraction,int,float)) and _converter(type(n)):
+            n=Fraction(*_converter(type(n))(n))
+        if not isinstance(d,(Fraction,int,float)) and _converter(type(d)):
+            d=Fraction(*_converter(type(d))(d))
         if (not isinstance(n,(Fraction,int,float))) or (not isinstance(d,(Fraction,int,float))):
              raise TypeError("Numerator and denominator must be int, float, or Fraction")
         
@@ -51,6 +264,24 @@ class Fraction:
         self.__den //= gc
         if self.__den<0:
                     self.__num,self.__den=-self.__num,-self.__den
+    @classmethod
+    def _from_ints(cls,n:int,d:int)->Fraction:
+        '''
+        Build a normalized Fraction from two ints, skipping the type checks of __init__.
+        Used by the operators, which already know both values are ints and d is non-zero.
+        Inside a BoundedDenominator block the result is snapped to the configured bound.
+        '''
+        gc=math.gcd(n,d)
+        if d<0:
+            gc=-gc
+        f=object.__new__(Fraction)
+        f.__num=n//gc
+        f.__den=d//gc
+        bound=_active_bound.get()
+        if bound is not None and f.__den>bound.max_denominator:
+            return bound._snap(f)
+        return f
+
     def __str__(self)->str:
         '''
         Return the human-readable string representation of the fraction.
@@ -76,15 +307,19 @@ class Fraction:
     def __add__(self,other:int|float|Fraction)->float|Fraction:
         '''
         Add this Fraction with int, float, or another Fraction.
+        Any numbers.Rational (e.g. fractions.Fraction, NumPy integers) and decimal.Decimal
+        are added exactly through their numerator and denominator.
         Note:
             Returns float when adding with float.
         '''     
-        if isinstance(other,int):          
-            return Fraction(self.__den*other+self.__num,self.__den)  
-        if isinstance(other,float):
+        if type(other) is int:          
+            return Fraction._from_ints(self.__den*other+self.__num,self.__den)  
+        convert=_converter(type(other))
+        if convert is float:
             return float(self)+other                          
-        if  isinstance(other,Fraction):
-            return Fraction(self.__num*other.__den+self.__den*other.__num,self.__den*other.__den)  
+        if convert:
+            n,d=convert(other)
+            return Fraction._from_ints(self.__num*d+self.__den*n,self.__den*d)  
         return NotImplemented
     
     def __radd__(self,other:int|float|Fraction)->float|Fraction:    
@@ -100,12 +335,14 @@ class Fraction:
         Note:
             Returns float when subtracting float.
         '''      
-        if isinstance(other,int):   
-            return Fraction(self.__num-self.__den*other,self.__den) 
-        if isinstance(other,float):
+        if type(other) is int:   
+            return Fraction._from_ints(self.__num-self.__den*other,self.__den) 
+        convert=_converter(type(other))
+        if convert is float:
             return float(self)-other
-        if  isinstance(other,Fraction):
-            return Fraction(self.__num*other.__den-self.__den*other.__num,self.__den*other.__den)   
+        if convert:
+            n,d=convert(other)
+            return Fraction._from_ints(self.__num*d-self.__den*n,self.__den*d)   
         return NotImplemented
     
     def __rsub__(self,other:int|float|Fraction)->float|Fraction:    
@@ -121,12 +358,20 @@ class Fraction:
         Note:
             Returns float when multiplying with float.
         '''
-        if isinstance(other,int):         
-            return Fraction(other*self.__num,self.__den)   
-        if isinstance(other,float):
+        if type(other) is int:         
+            return Fraction._from_ints(other*self.__num,self.__den)   
+        convert=_converter(type(other))
+        if convert is float:
             return float(self)*other
-        if  isinstance(other,Fraction):
-            return Fraction(self.__num*other.__num,self.__den*other.__den) 
+        if convert:
+            n,d=convert(other)
+            cache=_active_cache.get()
+            if cache is not None:
+                small=cache._small
+                if not (-small<self.__num<small and self.__den<small and -small<n<small and d<small) \
+                        and _active_bound.get() is None:
+                    return cache._lookup('*',self.__num,self.__den,n,d)
+            return Fraction._from_ints(self.__num*n,self.__den*d) 
         return NotImplemented
     
     def __rmul__(self,other:int|float|Fraction)->float|Fraction:
@@ -144,21 +389,29 @@ class Fraction:
             Note:
                 Returns float when dividing with float
         '''
-        if isinstance(other,int): 
+        if type(other) is int: 
             if other==0:            
                 raise ZeroDivisionError("Cannot divide by zero")  
             else:
-                return Fraction(self.__num,other*self.__den)  
-        if isinstance(other,float):
+                return Fraction._from_ints(self.__num,other*self.__den)  
+        convert=_converter(type(other))
+        if convert is float:
             if other==0:            
                 raise ZeroDivisionError("Cannot divide by zero")
             else:
                 return float(self)/other
-        if  isinstance(other,Fraction):
-            if other.__num==0:            
+        if convert:
+            n,d=convert(other)
+            if n==0:            
                 raise ZeroDivisionError("Cannot divide by zero")
             else:
-                return Fraction(self.__num*other.__den,self.__den*other.__num) 
+                cache=_active_cache.get()
+                if cache is not None:
+                    small=cache._small
+                    if not (-small<self.__num<small and self.__den<small and -small<n<small and d<small) \
+                            and _active_bound.get() is None:
+                        return cache._lookup('/',self.__num,self.__den,n,d)
+                return Fraction._from_ints(self.__num*d,self.__den*n) 
         return NotImplemented
     
     def __rtruediv__(self,other:int|float|Fraction)->float|Fraction:   
@@ -169,11 +422,39 @@ class Fraction:
         '''
         if self.__num==0:
             raise ZeroDivisionError("Cannot divide by zero")  
-        if isinstance(other ,int):
-            return Fraction(other*self.__den,self.__num)  
-        if isinstance(other,float):     
+        if type(other) is int:
+            return Fraction._from_ints(other*self.__den,self.__num)  
+        convert=_converter(type(other))
+        if convert is float:     
             return other/float(self)
+        if convert:
+            n,d=convert(other)
+            return Fraction._from_ints(n*self.__den,d*self.__num)
         return NotImplemented
+
+    def _cross(self,other:object)->tuple[int,int|float]|None:
+        '''
+        Return the pair (self.num*other.den, self.den*other.num) used by the comparisons.
+        Floats are compared exactly through as_integer_ratio(). For an infinite or NaN float
+        or Decimal the pair is (0, inf/-inf/nan), so == is False, != is True and ordering
+        is decided by the sign. Returns None when other is not a number.
+        '''
+        if type(other) is int:
+            return self.__num,self.__den*other
+        convert=_converter(type(other))
+        if convert is float:
+            if not math.isfinite(other):
+                return 0,other
+            n,d=other.as_integer_ratio()
+            return self.__num*d,self.__den*n
+        if convert is _decimal_pair and not other.is_finite():
+            if other.is_nan():
+                return 0,math.nan
+            return 0,-math.inf if other.is_signed() else math.inf
+        if convert:
+            n,d=convert(other)
+            return self.__num*d,self.__den*n
+        return None
     
     def __lt__(self, other:int|float|Fraction)->bool:
         '''
@@ -181,11 +462,12 @@ class Fraction:
         Returns:
             bool: True if this Fraction is less, otherwise False.
         '''
-        if isinstance(other,(float,int)):
-            return float(self)<other
-        if  isinstance(other,Fraction):
+        if type(other) is Fraction:
             return self.__num*other.__den<self.__den*other.__num
-        return NotImplemented
+        pair=self._cross(other)
+        if pair is None:
+            return NotImplemented
+        return pair[0]<pair[1]
     
     def __gt__(self, other:int|float|Fraction)->bool:
         '''
@@ -193,11 +475,12 @@ class Fraction:
         Returns:
             bool: True if this Fraction is greater, otherwise False.
         '''
-        if isinstance(other,(float,int)):
-            return float(self)>other
-        if  isinstance(other,Fraction):
+        if type(other) is Fraction:
             return self.__num*other.__den>self.__den*other.__num
-        return NotImplemented
+        pair=self._cross(other)
+        if pair is None:
+            return NotImplemented
+        return pair[0]>pair[1]
     
     def __le__(self,other:int|float|Fraction)->bool:
         '''
@@ -205,11 +488,12 @@ class Fraction:
         Returns:
             bool: True if this Fraction is less than or euqal, otherwise False.
         '''
-        if isinstance(other,(float,int)):
-            return float(self)<=other
-        if  isinstance(other,Fraction):
+        if type(other) is Fraction:
             return self.__num*other.__den<=self.__den*other.__num
-        return NotImplemented
+        pair=self._cross(other)
+        if pair is None:
+            return NotImplemented
+        return pair[0]<=pair[1]
     
     def __ge__(self,other:int|float|Fraction)->bool:
         '''
@@ -217,31 +501,34 @@ class Fraction:
         Returns:
             bool: True if this Fraction is greater than or equal, otherwise False.
         '''
-        if isinstance(other,(float,int)):
-            return float(self)>=other
-        if  isinstance(other,Fraction):
+        if type(other) is Fraction:
             return self.__num*other.__den>=self.__den*other.__num
-        return NotImplemented
+        pair=self._cross(other)
+        if pair is None:
+            return NotImplemented
+        return pair[0]>=pair[1]
     
     def __ne__(self, other:int|float|Fraction)->bool:
         '''
         Check if this Fraction is not equal to another value.
         '''
-        if isinstance(other,(float,int)):
-            return float(self)!=other
-        if  isinstance(other,Fraction):
-            return self.__num*other.__den!=self.__den*other.__num
-        return NotImplemented
+        if type(other) is Fraction:
+            return self.__num!=other.__num or self.__den!=other.__den
+        pair=self._cross(other)
+        if pair is None:
+            return NotImplemented
+        return pair[0]!=pair[1]
     
     def __eq__(self, other:int|float|Fraction)->bool:
         '''
         Check if this Fraction is equal to another value.
         '''
-        if isinstance(other,(float,int)):
-            return float(self)==other
-        if  isinstance(other,Fraction):
-            return self.__num*other.__den==self.__den*other.__num
-        return NotImplemented
+        if type(other) is Fraction:
+            return self.__num==other.__num and self.__den==other.__den
+        pair=self._cross(other)
+        if pair is None:
+            return NotImplemented
+        return pair[0]==pair[1]
     
     
     def __neg__(self)->Fraction: 
@@ -294,6 +581,64 @@ class Fraction:
             raise ValueError("Zero has no reciprocal")
         return Fraction(self.__den, self.__num) 
     
+    def limit_denominator(self,max_denominator:int=1000000,rounding:str=decimal.ROUND_HALF_EVEN)->Fraction:
+        '''
+        Return the closest Fraction to this one whose denominator is at most max_denominator.
+        The two candidates on either side come from the continued fraction expansion.
+        Rounding picks between them: decimal.ROUND_FLOOR / ROUND_CEILING / ROUND_DOWN / ROUND_UP
+        choose a direction, and the ROUND_HALF_* modes choose the nearer one (on a tie,
+        HALF_UP goes away from zero, HALF_DOWN toward zero, HALF_EVEN the smaller denominator).
+        Raises:
+            TypeError: If max_denominator is not an int.
+            ValueError: If max_denominator is less than 1 or rounding is not supported.
+        '''
+        if not isinstance(max_denominator,int):
+            raise TypeError('max_denominator must be an int value')
+        if max_denominator<1:
+            raise ValueError("max_denominator must be at least 1")
+        if rounding not in _ROUNDING_MODES:
+            raise ValueError("Unsupported rounding mode: {}".format(rounding))
+        if self.__den<=max_denominator:
+            return self
+        p0,q0,p1,q1=0,1,1,0
+        n,d=self.__num,self.__den
+        while True:
+            a=n//d
+            q2=q0+a*q1
+            if q2>max_denominator:
+                break
+            p0,q0,p1,q1=p1,q1,p0+a*p1,q2
+            n,d=d,n-a*d
+        k=(max_denominator-q0)//q1
+        semi=(p0+k*p1,q0+k*q1)
+        conv=(p1,q1)
+        if p1*self.__den<self.__num*q1:
+            lower,upper=conv,semi
+        else:
+            lower,upper=semi,conv
+        if rounding==decimal.ROUND_FLOOR or (rounding==decimal.ROUND_DOWN and self.__num>0) \
+                or (rounding==decimal.ROUND_UP and self.__num<0):
+            p,q=lower
+        elif rounding in (decimal.ROUND_CEILING,decimal.ROUND_DOWN,decimal.ROUND_UP):
+            p,q=upper
+        else:
+            gap_conv=abs(conv[0]*self.__den-self.__num*conv[1])*semi[1]
+            gap_semi=abs(semi[0]*self.__den-self.__num*semi[1])*conv[1]
+            if gap_conv<gap_semi:
+                p,q=conv
+            elif gap_semi<gap_conv:
+                p,q=semi
+            elif rounding==decimal.ROUND_HALF_UP:
+                p,q=upper if self.__num>0 else lower
+            elif rounding==decimal.ROUND_HALF_DOWN:
+                p,q=lower if self.__num>0 else upper
+            else:
+                p,q=conv
+        f=object.__new__(Fraction)
+        f.__num=p
+        f.__den=q
+        return f
+
     def to_tuple(self)->tuple[int, int]:     
         '''
         Convert this Fraction to tuple form.
@@ -305,10 +650,22 @@ class Fraction:
     def __hash__(self)->int:
         '''
         Return hash value of this Fraction.
+        Uses Python's numeric hash (numerator times the inverse of the denominator modulo
+        sys.hash_info.modulus), so it matches int, float, Decimal and fractions.Fraction
+        for every value they compare equal to.
         Returns:
             int: Hash value.
         '''
-        return hash(self.__num / self.__den)  
+        if self.__den==1:
+            return hash(self.__num)
+        try:
+            inverse=pow(self.__den,-1,_HASH_MODULUS)
+        except ValueError:
+            result=_HASH_INF
+        else:
+            result=hash(hash(abs(self.__num))*inverse)
+        result=result if self.__num>=0 else -result
+        return -2 if result==-1 else result
     
     def is_proper(self)->bool:
         '''
@@ -332,6 +689,150 @@ class Fraction:
         Always in the form p/q unlike __str__
         '''
         return '{a}/{b}'.format(a=int(self.__num),b=int(self.__den))
+
+    def to_decimal(self,digits:int=10,rounding:str=decimal.ROUND_HALF_EVEN)->str:
+        '''
+        Return the exact decimal expansion of this Fraction rounded to a fixed number of digits.
+        The expansion is produced by one integer division scaled by 10**digits and written
+        out in blocks of digits, so no float is involved and huge values keep every digit.
+        Rounding accepts the decimal module's modes, default decimal.ROUND_HALF_EVEN.
+        Raises:
+            TypeError: If digits is not an int.
+            ValueError: If digits is negative or rounding is not supported.
+        '''
+        if not isinstance(digits,int):
+            raise TypeError('Digits must be an int value')
+        if digits<0:
+            raise ValueError("Digits must not be negative")
+        q=_round_div(self.__num*10**digits,self.__den,rounding)
+        sign='-' if q<0 else ''
+        s=_decimal_digits(abs(q),digits+1)
+        if digits==0:
+            return sign+s
+        return '{}{}.{}'.format(sign,s[:-digits],s[-digits:])
+
+    def to_repeating(self,max_period:int=100000)->str:
+        '''
+        Return the exact decimal expansion of this Fraction with the repeating part in brackets.
+        For example 1/6 gives "0.1(6)" and 1/4 gives "0.25".
+        The non-repeating length comes from the powers of 2 and 5 in the denominator and the
+        period from the multiplicative order of 10 modulo what is left, so both blocks are
+        produced with one integer division each.
+        The period can be as long as denominator-1 digits, so it is capped by max_period;
+        the cap is checked before any digit is expanded and also bounds the factor search.
+        Raises:
+            TypeError: If max_period is not an int.
+            ValueError: If max_period is less than 1 or the period is longer than max_period.
+        '''
+        if not isinstance(max_period,int):
+            raise TypeError('max_period must be an int value')
+        if max_period<1:
+            raise ValueError("max_period must be at least 1")
+        sign='-' if self.__num<0 else ''
+        whole,rem=divmod(abs(self.__num),self.__den)
+        if rem==0:
+            return sign+_decimal_digits(whole)
+        whole=_decimal_digits(whole)
+        rest,twos,fives=self.__den,0,0
+        while rest%2==0:
+            rest//=2
+            twos+=1
+        while rest%5==0:
+            rest//=5
+            fives+=1
+        pre=max(twos,fives)
+        head,rem=divmod(rem*10**pre,self.__den)
+        head=_decimal_digits(head,pre) if pre else ''
+        if rem==0:
+            return '{}{}.{}'.format(sign,whole,head)
+        period=_multiplicative_order(10,rest,max_period)
+        cycle=_decimal_digits(rem*(10**period-1)//self.__den,period)
+        return '{}{}.{}({})'.format(sign,whole,head,cycle)
+
+    def __format__(self,spec:str)->str:
+        '''
+        Format this Fraction with format() and f-strings.
+        Supports the 'f', 'F', 'e', 'E' and '%' presentation types exactly (no float
+        conversion) along with the usual fill, align, sign, 'z', '#', width and ',' or '_'
+        grouping options, laid out the way float formats them. Without a presentation type
+        the str() form is aligned and padded.
+        Raises:
+            ValueError: If the format spec is not supported.
+        '''
+        kind=spec[-1:]
+        if kind in ('f','%') and spec[:1]=='.' and spec[1:-1].isdigit():
+            prec=int(spec[1:-1])
+            shift=prec+2 if kind=='%' else prec
+            q=_round_div(self.__num*10**shift,self.__den,decimal.ROUND_HALF_EVEN)
+            digits=_decimal_digits(abs(q),prec+1)
+            sign='-' if self.__num<0 else ''
+            if prec:
+                digits=digits[:-prec]+'.'+digits[-prec:]
+            return sign+digits+'%' if kind=='%' else sign+digits
+        match=_FORMAT_SPEC.fullmatch(spec)
+        if match is None:
+            raise ValueError("Invalid format specifier for Fraction: {!r}".format(spec))
+        fill,align,sign,z,alt,zero,width,sep,prec,kind=match.groups()
+        if not kind:
+            if prec is not None:
+                raise ValueError("Precision requires a presentation type for Fraction")
+            return format(str(self),spec)
+        prec=6 if prec is None else int(prec)
+        if kind in 'fF%':
+            shift=prec+2 if kind=='%' else prec
+            q=abs(_round_div(self.__num*10**shift,self.__den,decimal.ROUND_HALF_EVEN))
+            digits=_decimal_digits(q,prec+1)
+            whole,point=digits[:len(digits)-prec],digits[len(digits)-prec:]
+            suffix='%' if kind=='%' else ''
+        else:
+            n=abs(self.__num)
+            exp=0
+            q=0
+            if n:
+                exp=int((n.bit_length()-self.__den.bit_length())*0.30102999566398120)
+                while n*10**max(-exp,0)<self.__den*10**max(exp,0):
+                    exp-=1
+                while n*10**max(-exp-1,0)>=self.__den*10**max(exp+1,0):
+                    exp+=1
+                shift=prec-exp
+                if shift>=0:
+                    q=_round_div(n*10**shift,self.__den,decimal.ROUND_HALF_EVEN)
+                else:
+                    q=_round_div(n,self.__den*10**-shift,decimal.ROUND_HALF_EVEN)
+                if q==10**(prec+1):
+                    q//=10
+                    exp+=1
+            digits=_decimal_digits(q,prec+1)
+            whole,point=digits[0],digits[1:]
+            suffix='{}{}{:02d}'.format(kind,'-' if exp<0 else '+',abs(exp))
+        if self.__num<0 and not (z and q==0):
+            sign='-'
+        else:
+            sign=sign.strip('-')
+        tail=('.'+point if point or alt else '')+suffix
+        width=int(width or 0)
+        fill=fill or ('0' if zero else ' ')
+        align=align or ('=' if zero else '>')
+        if align=='=' and fill=='0':
+            need=width-len(sign)-len(tail)
+            k=len(whole)
+            while k+(k-1)//3*bool(sep)<need:
+                k+=1
+            whole=whole.rjust(k,'0')
+        if sep:
+            head=len(whole)%3 or 3
+            whole=sep.join([whole[:head]]+[whole[i:i+3] for i in range(head,len(whole),3)])
+        text=sign+whole+tail
+        pad=width-len(text)
+        if pad<=0:
+            return text
+        if align=='=':
+            return sign+fill*pad+whole+tail
+        if align=='<':
+            return text+fill*pad
+        if align=='^':
+            return fill*(pad//2)+text+fill*(pad-pad//2)
+        return fill*pad+text
     
     @classmethod
     def from_string(cls, s:str)->Fraction:  
@@ -385,5 +886,1428 @@ class Fraction:
             n = math.floor(value * scale +0.5)
         d = scale
         return cls(n, d)
- 
 
+
+class OperationCache(contextlib.ContextDecorator):
+    '''
+    Opt-in LRU cache for exact Fraction multiplication and division results.
+    Operations are only cached while the cache is active, either inside a with block
+    or inside a function decorated with the cache. Results are keyed on the operator
+    and both (numerator, denominator) pairs, so a repeated operand pair skips the
+    cross-products and the GCD. The cache is active only in the current thread or task;
+    one instance may be shared by many of them, and its table and counters are lock-protected.
+    Attributes:
+        maxsize (int): Maximum number of cached results before the least recently used is evicted.
+        max_bits (int): Operands with a numerator or denominator longer than this many bits are never cached.
+        min_bits (int): Operations whose operands all fit in this many bits are computed directly,
+            because for word-sized operands the product is cheaper than a cache lookup.
+        hits (int): Number of operations answered from the cache.
+        misses (int): Number of cacheable operations that had to be computed.
+        evictions (int): Number of results dropped to respect maxsize.
+    '''
+    def __init__(self,maxsize:int=4096,max_bits:int=2048,min_bits:int=64)->None:
+        '''
+        Initialize an empty OperationCache.
+        Raises:
+            TypeError: If maxsize, max_bits or min_bits is not an int.
+            ValueError: If maxsize is not positive, min_bits is negative or max_bits < min_bits.
+        '''
+        if not isinstance(maxsize,int) or not isinstance(max_bits,int) or not isinstance(min_bits,int):
+            raise TypeError('maxsize, max_bits and min_bits must be int values')
+        if maxsize<=0:
+            raise ValueError("maxsize must be positive")
+        if min_bits<0:
+            raise ValueError("min_bits must not be negative")
+        if max_bits<min_bits:
+            raise ValueError("max_bits must not be less than min_bits")
+        self.maxsize=maxsize
+        self.max_bits=max_bits
+        self.min_bits=min_bits
+        self._small=1<<min_bits
+        self._large=1<<max_bits
+        self.hits=0
+        self.misses=0
+        self.evictions=0
+        self._results:OrderedDict[tuple,Fraction]=OrderedDict()
+        self._lock=threading.Lock()
+
+    def __enter__(self)->OperationCache:
+        '''
+        Make this cache the active one in the current thread or task until the matching __exit__.
+        '''
+        _enter_context(_active_cache,self)
+        return self
+
+    def __exit__(self,*exc:object)->None:
+        '''
+        Restore whichever cache (or none) was active before __enter__.
+        '''
+        _exit_context(_active_cache)
+
+    def __len__(self)->int:
+        '''
+        Return the number of cached results.
+        '''
+        return len(self._results)
+
+    def _lookup(self,op:str,n1:int,d1:int,n2:int,d2:int)->Fraction:
+        '''
+        Return n1/d1 * n2/d2 (op '*') or n1/d1 / (n2/d2) (op '/'), from the cache when possible.
+        Operands longer than max_bits are computed directly and leave the cache untouched.
+        The operators only call this when some operand is longer than min_bits, since for
+        word-sized operands the product is cheaper than hashing the key.
+        '''
+        large=self._large
+        if not (-large<n1<large and d1<large and -large<n2<large and d2<large):
+            if op=='*':
+                return Fraction._from_ints(n1*n2,d1*d2)
+            return Fraction._from_ints(n1*d2,d1*n2)
+        key=(op,n1,d1,n2,d2)
+        results=self._results
+        with self._lock:
+            result=results.get(key)
+            if result is not None:
+                results.move_to_end(key)
+                self.hits+=1
+                return result
+            self.misses+=1
+        if op=='*':
+            result=Fraction._from_ints(n1*n2,d1*d2)
+        else:
+            result=Fraction._from_ints(n1*d2,d1*n2)
+        with self._lock:
+            results[key]=result
+            if len(results)>self.maxsize:
+                results.popitem(last=False)
+                self.evictions+=1
+        return result
+
+    def stats(self)->dict[str,int]:
+        '''
+        Return the hit, miss and eviction counters and the current size.
+        '''
+        with self._lock:
+            return {'hits':self.hits,'misses':self.misses,'evictions':self.evictions,'size':len(self._results)}
+
+    def clear(self)->None:
+        '''
+        Drop every cached result and reset the counters.
+        '''
+        with self._lock:
+            self._results.clear()
+            self.hits=0
+            self.misses=0
+            self.evictions=0
+
+
+class BoundedDenominator(contextlib.ContextDecorator):
+    '''
+    Arithmetic mode that keeps the denominator of every operator result within a bound.
+    Inside the block each result of +, -, * and / whose denominator exceeds max_denominator is
+    replaced by limit_denominator(max_denominator, rounding), so operand size and per-operation
+    cost stay bounded at the price of a controlled, reported error. The mode is stored in a
+    context variable, so it only applies to the current thread or asyncio task.
+    Attributes:
+        max_denominator (int): Largest denominator a result may keep.
+        rounding (str): Rounding mode passed to limit_denominator.
+        snapped (int): Number of results that had to be approximated.
+        error (float): Sum of the absolute approximation errors.
+        max_error (float): Largest single approximation error.
+    '''
+    def __init__(self,max_denominator:int,rounding:str=decimal.ROUND_HALF_EVEN)->None:
+        '''
+        Initialize the mode with zeroed error counters.
+        Raises:
+            TypeError: If max_denominator is not an int.
+            ValueError: If max_denominator is less than 1 or rounding is not supported.
+        '''
+        if not isinstance(max_denominator,int):
+            raise TypeError('max_denominator must be an int value')
+        if max_denominator<1:
+            raise ValueError("max_denominator must be at least 1")
+        if rounding not in _ROUNDING_MODES:
+            raise ValueError("Unsupported rounding mode: {}".format(rounding))
+        self.max_denominator=max_denominator
+        self.rounding=rounding
+        self.snapped=0
+        self.error=0.0
+        self.max_error=0.0
+        self._lock=threading.Lock()
+
+    def __enter__(self)->BoundedDenominator:
+        '''
+        Make this mode the active one in the current thread or task until the matching __exit__.
+        '''
+        _enter_context(_active_bound,self)
+        return self
+
+    def __exit__(self,*exc:object)->None:
+        '''
+        Restore whichever mode (or none) was active before __enter__.
+        '''
+        _exit_context(_active_bound)
+
+    def _snap(self,f:Fraction)->Fraction:
+        '''
+        Approximate f within the bound and record the error made.
+        '''
+        g=f.limit_denominator(self.max_denominator,self.rounding)
+        n,d=f.to_tuple()
+        p,q=g.to_tuple()
+        err=abs(n*q-p*d)/(d*q)
+        with self._lock:
+            self.snapped+=1
+            self.error+=err
+            if err>self.max_error:
+                self.max_error=err
+        return g
+
+    def reset(self)->None:
+        '''
+        Zero the error counters.
+        '''
+        with self._lock:
+            self.snapped=0
+            self.error=0.0
+            self.max_error=0.0
+
+
+class StreamingStats:
+    '''
+    Single-pass exact statistics over a stream of Fractions.
+    The sum of values and the sum of squares are kept as unnormalized integer pairs over a
+    common denominator (the LCM of the denominators seen so far), so adding a value with an
+    already-seen denominator is one multiply and one add, and no GCD reduction happens until
+    a result is asked for. Memory is constant apart from the optional quantile reservoir.
+    Attributes:
+        count (int): Number of values added.
+        minimum (Fraction|None): Smallest value added, None while empty.
+        maximum (Fraction|None): Largest value added, None while empty.
+        reservoir_size (int): Number of values kept for quantiles, 0 to disable them.
+    '''
+    def __init__(self,reservoir_size:int=0,seed:int|None=None)->None:
+        '''
+        Initialize an empty accumulator.
+        When reservoir_size is positive a uniform random sample of that many values is kept
+        (reservoir sampling) and used by quantile(); seed makes the sample reproducible.
+        Raises:
+            TypeError: If reservoir_size is not an int.
+            ValueError: If reservoir_size is negative.
+        '''
+        if not isinstance(reservoir_size,int):
+            raise TypeError('reservoir_size must be an int value')
+        if reservoir_size<0:
+            raise ValueError("reservoir_size must not be negative")
+        self.count=0
+        self.minimum:Fraction|None=None
+        self.maximum:Fraction|None=None
+        self.reservoir_size=reservoir_size
+        self._sum_num,self._sum_den=0,1
+        self._sq_num,self._sq_den=0,1
+        self._reservoir:list[Fraction]=[]
+        import random
+        self._rng=random.Random(seed)
+
+    def add(self,value:int|float|Fraction)->None:
+        '''
+        Add one value to the statistics.
+        Accepts anything Fraction() accepts.
+        '''
+        if type(value) is not Fraction:
+            value=Fraction(value)
+        n,d=value.to_tuple()
+        if d==self._sum_den:
+            self._sum_num+=n
+        else:
+            g=math.gcd(self._sum_den,d)
+            self._sum_num=self._sum_num*(d//g)+n*(self._sum_den//g)
+            self._sum_den=self._sum_den//g*d
+        dd=d*d
+        if dd==self._sq_den:
+            self._sq_num+=n*n
+        else:
+            g=math.gcd(self._sq_den,dd)
+            self._sq_num=self._sq_num*(dd//g)+n*n*(self._sq_den//g)
+            self._sq_den=self._sq_den//g*dd
+        self.count+=1
+        if self.minimum is None or value<self.minimum:
+            self.minimum=value
+        if self.maximum is None or value>self.maximum:
+            self.maximum=value
+        if self.reservoir_size:
+            if len(self._reservoir)<self.reservoir_size:
+                self._reservoir.append(value)
+            else:
+                j=self._rng.randrange(self.count)
+                if j<self.reservoir_size:
+                    self._reservoir[j]=value
+
+    def update(self,values:Iterable[int|float|Fraction])->StreamingStats:
+        '''
+        Add every value from an iterable and return self.
+        '''
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self,other:StreamingStats)->StreamingStats:
+        '''
+        Combine the statistics of another accumulator (e.g. from another shard) into this one.
+        Sums, count, minimum and maximum merge exactly. Reservoirs are combined by drawing
+        each slot from either side in proportion to the number of values it stands for.
+        Returns:
+            StreamingStats: self, for chaining.
+        '''
+        if not isinstance(other,StreamingStats):
+            raise TypeError('Can only merge another StreamingStats')
+        if other.count==0:
+            return self
+        self._sum_num,self._sum_den=_add_pairs(self._sum_num,self._sum_den,other._sum_num,other._sum_den)
+        self._sq_num,self._sq_den=_add_pairs(self._sq_num,self._sq_den,other._sq_num,other._sq_den)
+        if self.minimum is None or other.minimum<self.minimum:
+            self.minimum=other.minimum
+        if self.maximum is None or other.maximum>self.maximum:
+            self.maximum=other.maximum
+        if self.reservoir_size:
+            mine,theirs=list(self._reservoir),list(other._reservoir)
+            if len(mine)+len(theirs)<=self.reservoir_size:
+                self._reservoir=mine+theirs
+            else:
+                self._rng.shuffle(mine)
+                self._rng.shuffle(theirs)
+                left,right=self.count,other.count
+                merged=[]
+                while len(merged)<self.reservoir_size and (mine or theirs):
+                    if mine and (not theirs or self._rng.randrange(left+right)<left):
+                        merged.append(mine.pop())
+                    else:
+                        merged.append(theirs.pop())
+                self._reservoir=merged
+        self.count+=other.count
+        return self
+
+    def _require_values(self)->None:
+        '''
+        Raise ValueError if no value has been added yet.
+        '''
+        if self.count==0:
+            raise ValueError("No values have been added")
+
+    def total(self)->Fraction:
+        '''
+        Return the exact sum of all values.
+        '''
+        return Fraction(self._sum_num,self._sum_den)
+
+    def mean(self)->Fraction:
+        '''
+        Return the exact arithmetic mean.
+        Raises:
+            ValueError: If no values have been added.
+        '''
+        self._require_values()
+        return Fraction(self._sum_num,self._sum_den*self.count)
+
+    def variance(self,sample:bool=False)->Fraction:
+        '''
+        Return the exact population variance, or the sample variance when sample is True.
+        Computed as (sum of squares - sum**2/count) / (count or count-1) in integers.
+        Raises:
+            ValueError: If there are too few values.
+        '''
+        self._require_values()
+        div=self.count-1 if sample else self.count
+        if div==0:
+            raise ValueError("Sample variance needs at least two values")
+        s,sd=self._sum_num,self._sum_den
+        q,qd=self._sq_num,self._sq_den
+        # sum_sq - sum**2/count == (q*sd*sd*count - s*s*qd) / (qd*sd*sd*count)
+        return Fraction(q*sd*sd*self.count-s*s*qd,qd*sd*sd*self.count*div)
+
+    def quantile(self,q:int|float|Fraction)->Fraction:
+        '''
+        Return the q-th quantile (0 <= q <= 1) by linear interpolation over the reservoir.
+        The result is exact while count <= reservoir_size and an estimate after that.
+        Raises:
+            ValueError: If quantiles are disabled, no values were added or q is out of range.
+        '''
+        if not self.reservoir_size:
+            raise ValueError("Quantiles need a reservoir_size greater than zero")
+        self._require_values()
+        q=Fraction(q)
+        if q<0 or q>1:
+            raise ValueError("Quantile must be between 0 and 1")
+        ordered=sorted(self._reservoir)
+        pos=q*(len(ordered)-1)
+        lo=int(pos)
+        if lo==len(ordered)-1:
+            return ordered[lo]
+        return ordered[lo]+(ordered[lo+1]-ordered[lo])*(pos-lo)
+
+
+
+def _exact_add(a:Fraction,b:Fraction)->Fraction:
+    '''
+    Return a + b exactly, even inside a BoundedDenominator block.
+    '''
+    n1,d1=a.to_tuple()
+    n2,d2=b.to_tuple()
+    return Fraction(n1*d2+n2*d1,d1*d2)
+
+def _exact_mul(a:Fraction,b:Fraction)->Fraction:
+    '''
+    Return a * b exactly, even inside a BoundedDenominator block.
+    '''
+    n1,d1=a.to_tuple()
+    n2,d2=b.to_tuple()
+    return Fraction(n1*n2,d1*d2)
+
+
+class RationalInterval:
+    '''
+    Closed interval [lower, upper] of Fractions for certified error bounds.
+    After every operation the endpoints are rounded outward to the nearest fractions whose
+    denominator is at most max_denominator (lower toward -inf, upper toward +inf), so the
+    size of the endpoints stays fixed while the interval still contains the true result.
+    With max_denominator=None the endpoints are kept exact.
+    Attributes:
+        lower (Fraction): Lower endpoint.
+        upper (Fraction): Upper endpoint.
+        max_denominator (int|None): Bound used for outward rounding, None for exact endpoints.
+    '''
+    __slots__=("lower","upper","max_denominator")
+    def __init__(self,lower:int|Fraction,upper:int|Fraction|None=None,max_denominator:int|None=2**32)->None:
+        '''
+        Initialize an interval; a single value gives the point interval [lower, lower].
+        Endpoints are rounded outward to max_denominator straight away.
+        Raises:
+            TypeError: If an endpoint is a float or not a number, or max_denominator is not an int.
+            ValueError: If lower > upper or max_denominator is less than 1.
+        '''
+        if isinstance(lower,float) or isinstance(upper,float):
+            raise TypeError('Interval endpoints must be exact; convert floats with Fraction.from_float first')
+        if max_denominator is not None:
+            if not isinstance(max_denominator,int):
+                raise TypeError('max_denominator must be an int value or None')
+            if max_denominator<1:
+                raise ValueError("max_denominator must be at least 1")
+        lower=lower if type(lower) is Fraction else Fraction(lower)
+        upper=lower if upper is None else upper if type(upper) is Fraction else Fraction(upper)
+        if lower>upper:
+            raise ValueError("Lower endpoint must not exceed upper endpoint")
+        if max_denominator is not None:
+            lower=lower.limit_denominator(max_denominator,decimal.ROUND_FLOOR)
+            upper=upper.limit_denominator(max_denominator,decimal.ROUND_CEILING)
+        self.lower=lower
+        self.upper=upper
+        self.max_denominator=max_denominator
+
+    def __repr__(self)->str:
+        '''
+        Return the interval as "[lower, upper]".
+        '''
+        return '[{}, {}]'.format(self.lower,self.upper)
+
+    __str__=__repr__
+
+    def _coerce(self,other:object)->RationalInterval|None:
+        '''
+        Return other as an interval, None if it cannot be used exactly.
+        '''
+        if isinstance(other,RationalInterval):
+            return other
+        if isinstance(other,float) or not _converter(type(other)):
+            return None
+        return RationalInterval(other,max_denominator=self.max_denominator)
+
+    def _bound(self,other:RationalInterval)->int|None:
+        '''
+        Return the bound for a result: exact if either side is exact, else the larger bound.
+        '''
+        if self.max_denominator is None or other.max_denominator is None:
+            return None
+        return max(self.max_denominator,other.max_denominator)
+
+    def with_bound(self,max_denominator:int|None)->RationalInterval:
+        '''
+        Return this interval with a new rounding bound; None switches to exact endpoints
+        for the final steps of a computation.
+        '''
+        return RationalInterval(self.lower,self.upper,max_denominator)
+
+    def __add__(self,other:int|Fraction|RationalInterval)->RationalInterval:
+        '''
+        Return [a+c, b+d] for [a, b] + [c, d], rounded outward.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return RationalInterval(_exact_add(self.lower,other.lower),_exact_add(self.upper,other.upper),
+                                self._bound(other))
+
+    __radd__=__add__
+
+    def __sub__(self,other:int|Fraction|RationalInterval)->RationalInterval:
+        '''
+        Return [a-d, b-c] for [a, b] - [c, d], rounded outward.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return RationalInterval(_exact_add(self.lower,-other.upper),_exact_add(self.upper,-other.lower),
+                                self._bound(other))
+
+    def __rsub__(self,other:int|Fraction)->RationalInterval:
+        '''
+        Perform reverse subtraction.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return other-self
+
+    def __neg__(self)->RationalInterval:
+        '''
+        Return [-b, -a].
+        '''
+        return RationalInterval(-self.upper,-self.lower,self.max_denominator)
+
+    def __mul__(self,other:int|Fraction|RationalInterval)->RationalInterval:
+        '''
+        Return the smallest interval holding all four endpoint products, rounded outward.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        products=[_exact_mul(x,y) for x in (self.lower,self.upper) for y in (other.lower,other.upper)]
+        return RationalInterval(min(products),max(products),self._bound(other))
+
+    __rmul__=__mul__
+
+    def __truediv__(self,other:int|Fraction|RationalInterval)->RationalInterval:
+        '''
+        Return self * [1/d, 1/c] for a divisor [c, d].
+        Raises:
+            ZeroDivisionError: If the divisor contains zero.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        if other.lower<=0<=other.upper:
+            raise ZeroDivisionError("Cannot divide by an interval containing zero")
+        lo,hi=other.upper.to_tuple(),other.lower.to_tuple()
+        inverse=RationalInterval(Fraction(lo[1],lo[0]),Fraction(hi[1],hi[0]),None)
+        result=self*inverse
+        return RationalInterval(result.lower,result.upper,self._bound(other))
+
+    def __rtruediv__(self,other:int|Fraction)->RationalInterval:
+        '''
+        Perform reverse division.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return other/self
+
+    def __contains__(self,value:int|Fraction)->bool:
+        '''
+        Check whether a value lies in the interval.
+        '''
+        return self.lower<=value<=self.upper
+
+    def __lt__(self,other:int|Fraction|RationalInterval)->bool:
+        '''
+        Check if every value of this interval is less than every value of other.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return self.upper<other.lower
+
+    def __le__(self,other:int|Fraction|RationalInterval)->bool:
+        '''
+        Check if every value of this interval is at most every value of other.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return self.upper<=other.lower
+
+    def __gt__(self,other:int|Fraction|RationalInterval)->bool:
+        '''
+        Check if every value of this interval is greater than every value of other.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return self.lower>other.upper
+
+    def __ge__(self,other:int|Fraction|RationalInterval)->bool:
+        '''
+        Check if every value of this interval is at least every value of other.
+        '''
+        other=self._coerce(other)
+        if other is None:
+            return NotImplemented
+        return self.lower>=other.upper
+
+    def __eq__(self,other:object)->bool:
+        '''
+        Check if both intervals have the same endpoints.
+        A scalar accepted by the ordering comparisons equals only the point interval holding
+        exactly that value; it is compared as is, not rounded to this interval's bound.
+        '''
+        if isinstance(other,RationalInterval):
+            return self.lower==other.lower and self.upper==other.upper
+        if isinstance(other,float) or not _converter(type(other)):
+            return NotImplemented
+        return self.lower==other and self.upper==other
+
+    def __hash__(self)->int:
+        '''
+        Return a hash consistent with endpoint equality; a point interval hashes like its value.
+        '''
+        if self.lower==self.upper:
+            return hash(self.lower)
+        return hash((self.lower,self.upper))
+
+    def width(self)->Fraction:
+        '''
+        Return upper - lower exactly.
+        '''
+        return _exact_add(self.upper,-self.lower)
+
+    def midpoint(self)->Fraction:
+        '''
+        Return (lower + upper) / 2 exactly.
+        '''
+        n,d=_exact_add(self.lower,self.upper).to_tuple()
+        return Fraction(n,2*d)
+
+def _reduced_entries(pairs:dict[int,tuple[int,int]])->dict[int,tuple[int,int]]:
+    '''
+    Return the non-zero pairs of a mapping in lowest terms with positive denominators.
+    '''
+    out={}
+    for i,(n,d) in pairs.items():
+        if n:
+            g=math.gcd(n,d)
+            if d<0:
+                g=-g
+            out[i]=(n//g,d//g)
+    return out
+
+
+class SparseRationalVector:
+    '''
+    Sparse vector of Fractions stored as {index: (numerator, denominator)} integer pairs.
+    Only non-zero entries are stored, always in lowest terms with a positive denominator.
+    dot() never builds intermediate Fractions: products are grouped by denominator, the
+    groups are summed over their LCM as one unnormalized pair, and the result is reduced once.
+    '''
+    __slots__=("_entries",)
+    def __init__(self,entries:dict[int,int|Fraction]|None=None)->None:
+        '''
+        Initialize a vector from a mapping of index to value (anything Fraction() accepts).
+        Zero values are dropped. Indices may be any integral type (e.g. NumPy integers).
+        Raises:
+            TypeError: If an index is not integral.
+        '''
+        self._entries:dict[int,tuple[int,int]]={}
+        if entries:
+            for i,value in entries.items():
+                try:
+                    i=operator.index(i)
+                except TypeError:
+                    raise TypeError('Indices must be integral values') from None
+                n,d=(value if type(value) is Fraction else Fraction(value)).to_tuple()
+                if n:
+                    self._entries[i]=(n,d)
+
+    @classmethod
+    def from_dict(cls,entries:dict[int,int|Fraction])->SparseRationalVector:
+        '''
+        Create a vector from a mapping of index to value.
+        '''
+        return cls(entries)
+
+    @classmethod
+    def from_columns(cls,indices:Iterable[int],numerators:Iterable[int],
+                     denominators:Iterable[int]|None=None)->SparseRationalVector:
+        '''
+        Create a vector from parallel columns of indices, numerators and denominators
+        (all denominators 1 if omitted). Repeated indices are summed.
+        Indices and values must be integral (int or e.g. NumPy integers); floats are rejected,
+        not truncated.
+        Raises:
+            TypeError: If an index or a value is not integral.
+            ValueError: If the columns differ in length or a denominator is zero.
+        '''
+        indices=list(indices)
+        numerators=list(numerators)
+        denominators=[1]*len(indices) if denominators is None else list(denominators)
+        if not len(indices)==len(numerators)==len(denominators):
+            raise ValueError("Columns must have the same length")
+        sums:dict[int,tuple[int,int]]={}
+        for i,n,d in zip(indices,numerators,denominators):
+            try:
+                i=operator.index(i)
+            except TypeError:
+                raise TypeError('Indices must be integral values') from None
+            try:
+                n,d=operator.index(n),operator.index(d)
+            except TypeError:
+                raise TypeError('Numerators and denominators must be integral values') from None
+            if d==0:
+                raise ValueError("Zero in denominator is not permitted")
+            if i in sums:
+                sums[i]=_add_pairs(*sums[i],n,d)
+            else:
+                sums[i]=(n,d)
+        vector=cls()
+        vector._entries=_reduced_entries(sums)
+        return vector
+
+    def __len__(self)->int:
+        '''
+        Return the number of non-zero entries.
+        '''
+        return len(self._entries)
+
+    def __getitem__(self,index:int)->Fraction:
+        '''
+        Return the entry at index, zero if it is not stored.
+        '''
+        n,d=self._entries.get(index,(0,1))
+        return Fraction(n,d)
+
+    def __repr__(self)->str:
+        '''
+        Return the official string representation of this vector.
+        '''
+        return 'SparseRationalVector({{{}}})'.format(', '.join(
+            '{}: {}'.format(i,Fraction(n,d)) for i,(n,d) in sorted(self._entries.items())))
+
+    def __eq__(self,other:object)->bool:
+        '''
+        Check if both vectors hold the same entries.
+        '''
+        if not isinstance(other,SparseRationalVector):
+            return NotImplemented
+        return self._entries==other._entries
+
+    __hash__=None
+
+    def items(self)->list[tuple[int,Fraction]]:
+        '''
+        Return the non-zero entries as (index, Fraction) pairs sorted by index.
+        '''
+        return [(i,Fraction(n,d)) for i,(n,d) in sorted(self._entries.items())]
+
+    def to_dict(self)->dict[int,Fraction]:
+        '''
+        Return the non-zero entries as a dict of index to Fraction.
+        '''
+        return {i:Fraction(n,d) for i,(n,d) in self._entries.items()}
+
+    def __add__(self,other:SparseRationalVector)->SparseRationalVector:
+        '''
+        Return the entrywise sum of two vectors.
+        '''
+        if not isinstance(other,SparseRationalVector):
+            return NotImplemented
+        sums=dict(self._entries)
+        for i,(n,d) in other._entries.items():
+            sums[i]=_add_pairs(*sums[i],n,d) if i in sums else (n,d)
+        vector=SparseRationalVector()
+        vector._entries=_reduced_entries(sums)
+        return vector
+
+    def __sub__(self,other:SparseRationalVector)->SparseRationalVector:
+        '''
+        Return the entrywise difference of two vectors.
+        '''
+        if not isinstance(other,SparseRationalVector):
+            return NotImplemented
+        return self+other.scale(-1)
+
+    def scale(self,factor:int|Fraction)->SparseRationalVector:
+        '''
+        Return this vector multiplied by a scalar.
+        '''
+        fn,fd=(factor if type(factor) is Fraction else Fraction(factor)).to_tuple()
+        vector=SparseRationalVector()
+        if fn:
+            vector._entries=_reduced_entries({i:(n*fn,d*fd) for i,(n,d) in self._entries.items()})
+        return vector
+
+    def __mul__(self,factor:int|Fraction)->SparseRationalVector:
+        '''
+        Return this vector multiplied by a scalar; see scale().
+        '''
+        if isinstance(factor,(float,SparseRationalVector)) or not _converter(type(factor)):
+            return NotImplemented
+        return self.scale(factor)
+
+    __rmul__=__mul__
+
+    def dot(self,other:SparseRationalVector)->Fraction:
+        '''
+        Return the exact dot product of two vectors.
+        Terms sharing a denominator are summed as plain integers before the groups are
+        combined over their LCM, and the single resulting pair is reduced once.
+        '''
+        if not isinstance(other,SparseRationalVector):
+            raise TypeError('Can only take the dot product with another SparseRationalVector')
+        small,large=self._entries,other._entries
+        if len(small)>len(large):
+            small,large=large,small
+        groups:dict[int,int]={}
+        for i,(n1,d1) in small.items():
+            pair=large.get(i)
+            if pair is not None:
+                d=d1*pair[1]
+                groups[d]=groups.get(d,0)+n1*pair[0]
+        num,den=0,1
+        for d,n in groups.items():
+            num,den=_add_pairs(num,den,n,d)
+        return Fraction(num,den)
+
+    def __matmul__(self,other:SparseRationalVector)->Fraction:
+        '''
+        Return the dot product, so a @ b works like a.dot(b).
+        '''
+        if not isinstance(other,SparseRationalVector):
+            return NotImplemented
+        return self.dot(other)
+
+_MR_BASES=(2,3,5,7,11,13,17,19,23,29,31,37)
+_task:tuple[Callable,tuple]|None=None
+
+def _is_prime(n:int)->bool:
+    '''
+    Deterministic Miller-Rabin test, exact for every n below 3.3*10**24.
+    '''
+    if n<2:
+        return False
+    for p in _MR_BASES:
+        if n%p==0:
+            return n==p
+    d,s=n-1,0
+    while d%2==0:
+        d//=2
+        s+=1
+    for a in _MR_BASES:
+        x=pow(a,d,n)
+        if x==1 or x==n-1:
+            continue
+        for _ in range(s-1):
+            x=x*x%n
+            if x==n-1:
+                break
+        else:
+            return False
+    return True
+
+def _word_primes(start:int=2**62)->Iterator[int]:
+    '''
+    Yield the primes below start in decreasing order.
+    '''
+    n=start-1 if start%2==0 else start-2
+    while n>2:
+        if _is_prime(n):
+            yield n
+        n-=2
+
+def rational_reconstruct(a:int,m:int,num_bound:int|None=None,den_bound:int|None=None)->Fraction|None:
+    '''
+    Return the unique Fraction n/d with |n| <= num_bound, 0 < d <= den_bound and n = a*d (mod m),
+    if any. Both bounds default to sqrt(m/2); the answer is unique when 2*num_bound*den_bound < m.
+    Uses the half extended Euclidean algorithm on (m, a).
+    Returns:
+        Fraction|None: The reconstructed value, or None when no such fraction exists.
+    '''
+    if num_bound is None or den_bound is None:
+        bound=math.isqrt(m//2)
+        num_bound=bound if num_bound is None else num_bound
+        den_bound=bound if den_bound is None else den_bound
+    r0,r1=m,a%m
+    t0,t1=0,1
+    while r1>num_bound:
+        q=r0//r1
+        r0,r1=r1,r0-q*r1
+        t0,t1=t1,t0-q*t1
+    if t1==0 or abs(t1)>den_bound or math.gcd(r1,t1)!=1:
+        return None
+    return Fraction(r1,t1)
+
+def _set_task(fn:Callable,args:tuple)->None:
+    '''
+    Store the per-prime task in a worker process, so its arguments are sent once.
+    '''
+    global _task
+    _task=(fn,args)
+
+def _run_task(p:int)->list[int]|None:
+    '''
+    Run the stored per-prime task in a worker process.
+    '''
+    fn,args=_task
+    return fn(p,*args)
+
+def multimodular(fn:Callable[...,list[int]|None],*args:object,jobs:int=1,stable:int=2,
+                 bound:tuple[int,int]|None=None)->list[Fraction]:
+    '''
+    Compute a list of rationals from their residues modulo many word-sized primes.
+    fn(p, *args) must return the residues of the wanted results modulo the prime p, or None
+    when p is unlucky (e.g. divides a denominator or makes a pivot vanish) and must be skipped.
+    Residues are merged with the Chinese remainder theorem and turned back into Fractions by
+    rational reconstruction. With bound=(N, D), every result n/d is known to satisfy |n| <= N
+    and 0 < d <= D: just enough primes are used for a provably correct reconstruction, and the
+    problem is reported unsolvable once the unlucky primes multiply to more than D. Results
+    that share a denominator are then read off the running common denominator, which is
+    unique within the bound, instead of each needing the Euclidean reconstruction. Without a
+    bound the loop stops once the reconstructed values have stayed the same for stable
+    consecutive rounds. With jobs > 1 each round computes jobs primes in worker processes;
+    fn must then be a module-level function.
+    Raises:
+        ValueError: If the unlucky primes exceed the bound, or every prime tried in a long row
+            is unlucky.
+        ArithmeticError: If the residues do not fit the given bound.
+    '''
+    if not isinstance(jobs,int) or not isinstance(stable,int):
+        raise TypeError('jobs and stable must be int values')
+    if jobs<1 or stable<1:
+        raise ValueError("jobs and stable must be at least 1")
+    if bound is not None:
+        num_bound,den_bound=(operator.index(b) for b in bound)
+        if num_bound<0 or den_bound<1:
+            raise ValueError("bound must be a pair (N, D) with N >= 0 and D >= 1")
+        target=2*num_bound*den_bound
+    primes=_word_primes()
+    pool=None
+    if jobs>1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool=ProcessPoolExecutor(jobs,initializer=_set_task,initargs=(fn,args))
+    try:
+        modulus=1
+        residues:list[int]|None=None
+        previous:list[Fraction]|None=None
+        agreed=0
+        unlucky=0
+        skipped=1
+        while True:
+            batch=[next(primes) for _ in range(jobs)]
+            if pool is None:
+                results=[fn(batch[0],*args)]
+            else:
+                results=list(pool.map(_run_task,batch))
+            for p,res in zip(batch,results):
+                if res is None:
+                    unlucky+=1
+                    skipped*=p
+                    if skipped>den_bound if bound is not None else unlucky>=32:
+                        raise ValueError("Every prime tried was unlucky; the problem has no rational solution")
+                    continue
+                unlucky=0
+                if residues is None:
+                    residues=list(res)
+                else:
+                    inv=pow(modulus,-1,p)
+                    residues=[r+modulus*((s-r)*inv%p) for r,s in zip(residues,res)]
+                modulus*=p
+            if residues is None:
+                continue
+            if bound is not None:
+                if modulus<=target:
+                    continue
+                current=[]
+                den=1
+                for r in residues:
+                    s=r*den%modulus
+                    value=Fraction(s-modulus if 2*s>modulus else s,den)
+                    n,d=value.to_tuple()
+                    if abs(n)>num_bound or d>den_bound:
+                        value=rational_reconstruct(r,modulus,num_bound,den_bound)
+                        if value is None:
+                            raise ArithmeticError("The residues do not match fractions within the given bound")
+                        den=math.lcm(den,value.to_tuple()[1])
+                    current.append(value)
+                return current
+            if rational_reconstruct(residues[-1],modulus) is None:
+                continue
+            current=[]
+            for r in residues:
+                value=rational_reconstruct(r,modulus)
+                if value is None:
+                    break
+                current.append(value)
+            else:
+                agreed=agreed+1 if current==previous else 0
+                previous=current
+                if agreed>=stable-1:
+                    return current
+                continue
+            previous=None
+            agreed=0
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def _integer_rows(matrix:list[list],rhs:list|None=None)->tuple[list[list[int]],list[int]|None,int]:
+    '''
+    Scale each row (and its right-hand side entry) by the LCM of its denominators.
+    Returns:
+        tuple: (integer matrix, integer rhs or None, product of the row scales)
+    '''
+    rows=[]
+    out=[] if rhs is not None else None
+    scale=1
+    for i,row in enumerate(matrix):
+        values=[v if type(v) is Fraction else Fraction(v) for v in row]
+        if rhs is not None:
+            values.append(rhs[i] if type(rhs[i]) is Fraction else Fraction(rhs[i]))
+        lcm=1
+        for v in values:
+            lcm=math.lcm(lcm,v.to_tuple()[1])
+        ints=[n*(lcm//d) for n,d in (v.to_tuple() for v in values)]
+        if out is not None:
+            out.append(ints.pop())
+        rows.append(ints)
+        scale*=lcm
+    return rows,out,scale
+
+def _check_square(matrix:list[list])->int:
+    '''
+    Return the size of a square matrix given as a list of rows.
+    Raises:
+        ValueError: If the matrix is empty or not square.
+    '''
+    n=len(matrix)
+    if n==0 or any(len(row)!=n for row in matrix):
+        raise ValueError("Matrix must be square and non-empty")
+    return n
+
+def _det_mod(p:int,rows:list[list[int]])->list[int]:
+    '''
+    Return [det(rows) mod p] by Gaussian elimination over GF(p).
+    Each step drops the eliminated row and column, so the work shrinks as it proceeds.
+    '''
+    a=[[x%p for x in row] for row in rows]
+    det=1
+    while a:
+        pivot=next((r for r in range(len(a)) if a[r][0]),None)
+        if pivot is None:
+            return [0]
+        if pivot:
+            a[0],a[pivot]=a[pivot],a[0]
+            det=-det
+        top=a[0]
+        det=det*top[0]%p
+        inv=pow(top[0],-1,p)
+        tail=[x*inv%p for x in top[1:]]
+        a=[[(x-row[0]*y)%p for x,y in zip(row[1:],tail)] if row[0] else row[1:] for row in a[1:]]
+    return [det%p]
+
+def _solve_mod(p:int,rows:list[list[int]],rhs:list[int])->list[int]|None:
+    '''
+    Return the solution of rows*x = rhs over GF(p), or None if the matrix is singular mod p.
+    Eliminates to a unit upper triangle and back-substitutes.
+    '''
+    a=[[x%p for x in row]+[b%p] for row,b in zip(rows,rhs)]
+    upper=[]
+    while a:
+        pivot=next((r for r in range(len(a)) if a[r][0]),None)
+        if pivot is None:
+            return None
+        a[0],a[pivot]=a[pivot],a[0]
+        top=a[0]
+        inv=pow(top[0],-1,p)
+        tail=[x*inv%p for x in top[1:]]
+        upper.append(tail)
+        a=[[(x-row[0]*y)%p for x,y in zip(row[1:],tail)] if row[0] else row[1:] for row in a[1:]]
+    x:list[int]=[]
+    for tail in reversed(upper):
+        x.insert(0,(tail[-1]-sum(c*v for c,v in zip(tail,x)))%p)
+    return x
+
+def _bareiss_det(rows:list[list[int]])->int:
+    '''
+    Return the exact determinant of an integer matrix by fraction-free (Bareiss) elimination.
+    Every division is exact, so entries never grow beyond the minors of the input.
+    '''
+    a=[list(row) for row in rows]
+    sign,prev=1,1
+    while len(a)>1:
+        pivot=next((r for r in range(len(a)) if a[r][0]),None)
+        if pivot is None:
+            return 0
+        if pivot:
+            a[0],a[pivot]=a[pivot],a[0]
+            sign=-sign
+        top=a[0]
+        akk,tail=top[0],top[1:]
+        a=[[(x*akk-row[0]*y)//prev for x,y in zip(row[1:],tail)] for row in a[1:]]
+        prev=akk
+    return sign*a[0][0]
+
+def _bareiss_solve(rows:list[list[int]],rhs:list[int])->list[Fraction]|None:
+    '''
+    Return the exact solution of rows*x = rhs by fraction-free (Bareiss) elimination, or None
+    if the matrix is singular. The last pivot d is +-det(rows), so d*x is an integer vector
+    (Cramer's rule) and back substitution stays in exact integer division.
+    '''
+    a=[list(row)+[b] for row,b in zip(rows,rhs)]
+    upper=[]
+    prev=1
+    while a:
+        pivot=next((r for r in range(len(a)) if a[r][0]),None)
+        if pivot is None:
+            return None
+        a[0],a[pivot]=a[pivot],a[0]
+        top=a[0]
+        upper.append(top)
+        akk,tail=top[0],top[1:]
+        a=[[(x*akk-row[0]*y)//prev for x,y in zip(row[1:],tail)] for row in a[1:]]
+        prev=akk
+    y:list[int]=[]
+    for top in reversed(upper):
+        y.insert(0,(prev*top[-1]-sum(c*v for c,v in zip(top[1:],y)))//top[0])
+    return [Fraction(v,prev) for v in y]
+
+def _norm_bound(values:Iterable[int])->int:
+    '''
+    Return ceil(sqrt(sum of squares)), an integer upper bound on the Euclidean norm.
+    '''
+    s=sum(v*v for v in values)
+    return math.isqrt(s-1)+1 if s else 0
+
+def _prefer_modular(method:str,rows:list[list[int]],target:int,results:int,jobs:int)->bool:
+    '''
+    Decide whether multimodular() should be used for an n x n integer system (rows may carry
+    a right-hand side) whose results need a CRT modulus above target. 'auto' compares rough
+    costs in word-sized operations: Bareiss works on minors of about n*bits/2 bits, whose
+    multiplication and division get superlinearly slower past a few hundred bits, while the
+    modular engine does one word-sized elimination per 61 bits of target, spread over jobs
+    processes, plus the CRT updates of every result.
+    Raises:
+        ValueError: If method is not 'auto', 'bareiss' or 'modular'.
+    '''
+    if method not in ('auto','bareiss','modular'):
+        raise ValueError("method must be 'auto', 'bareiss' or 'modular'")
+    if method!='auto':
+        return method=='modular'
+    n=len(rows[0])
+    bits=max(abs(x).bit_length() for row in rows for x in row)
+    primes=target.bit_length()//61+1
+    modular=primes*(n**3+n*n*bits//1600)/jobs+results*primes*primes/5+(200000 if jobs>1 else 0)
+    bareiss=n**3/3*(2.4+275*(n*bits/10000)**1.77)
+    return modular<bareiss
+
+def determinant(matrix:list[list[int|Fraction]],jobs:int=1,method:str='auto')->Fraction:
+    '''
+    Return the exact determinant of a square matrix of Fractions (or ints).
+    Each row is scaled to integers. The determinant is then found by fraction-free Bareiss
+    elimination, or modulo just enough word-sized primes to cover the Hadamard bound with
+    multimodular(), whichever method ('auto') is estimated to be faster. The modular engine
+    only wins for large entries or when jobs > 1 processes share the primes.
+    Raises:
+        ValueError: If the matrix is not square or method is unknown.
+    '''
+    _check_square(matrix)
+    rows,_,scale=_integer_rows(matrix)
+    bound=min(math.prod(_norm_bound(row) for row in rows),math.prod(_norm_bound(col) for col in zip(*rows)))
+    if bound==0:
+        return Fraction(0)
+    if _prefer_modular(method,rows,2*bound,1,jobs):
+        det=multimodular(_det_mod,rows,jobs=jobs,bound=(bound,1))[0].to_tuple()[0]
+    else:
+        det=_bareiss_det(rows)
+    return Fraction(det,scale)
+
+def solve(matrix:list[list[int|Fraction]],rhs:list[int|Fraction],jobs:int=1,method:str='auto')->list[Fraction]:
+    '''
+    Return the exact solution x of matrix*x = rhs as a list of Fractions.
+    Uses fraction-free Bareiss elimination or multimodular(), chosen as in determinant().
+    The modular route first checks the determinant modulo one prime: a non-zero residue
+    proves the matrix regular, while singularity is only reported once the primes with a
+    zero residue multiply past the bound on |det| (a single prime for small matrices).
+    Every numerator and denominator is bounded by Cramer's rule and the Hadamard bound, so
+    just enough primes are used; should the result still fail the final check against the
+    original system, it is recomputed by Bareiss elimination rather than reported as singular.
+    Raises:
+        ValueError: If the matrix is not square, sizes differ, method is unknown or the matrix
+            is singular.
+    '''
+    n=_check_square(matrix)
+    if len(rhs)!=n:
+        raise ValueError("Right-hand side must have one entry per row")
+    rows,b,_=_integer_rows(matrix,rhs)
+    cols=[_norm_bound(col) for col in zip(*rows)]
+    den_bound=min(math.prod(cols),math.prod(_norm_bound(row) for row in rows))
+    if den_bound==0:
+        raise ValueError("Matrix is singular")
+    num_bound=math.prod(cols)//min(cols)*_norm_bound(b)
+    if not _prefer_modular(method,rows+[b],2*num_bound*den_bound,n,jobs):
+        x=_bareiss_solve(rows,b)
+        if x is None:
+            raise ValueError("Matrix is singular")
+        return x
+    modulus=1
+    for p in _word_primes():
+        if _det_mod(p,rows)[0]:
+            break
+        modulus*=p
+        if modulus>den_bound:
+            raise ValueError("Matrix is singular")
+    try:
+        x=multimodular(_solve_mod,rows,b,jobs=jobs,bound=(num_bound,den_bound))
+    except (ValueError,ArithmeticError):
+        x=None
+    if x is not None:
+        xs=[v.to_tuple() for v in x]
+        den=1
+        for _,d in xs:
+            den=math.lcm(den,d)
+        xi=[v*(den//d) for v,d in xs]
+        if all(sum(a*v for a,v in zip(row,xi))==bi*den for row,bi in zip(rows,b)):
+            return x
+    return _bareiss_solve(rows,b)
+
+_REDUCE_OPS=('sum','product','stats')
+_MAX_RECORD_BYTES=1<<24
+_MAP_OPS=('reduce','decimal')
+
+def _read_text(paths:list[str])->Iterator[str]:
+    '''
+    Yield the non-blank lines of each file in turn, "-" meaning stdin.
+    Files are streamed, never read whole.
+    '''
+    for path in paths:
+        stream=sys.stdin if path=='-' else open(path,encoding='utf-8')
+        try:
+            for line in stream:
+                if line.strip():
+                    yield line
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+def _read_int(stream:BinaryIO)->int|None:
+    '''
+    Read one length-prefixed signed big-endian int, or None at a clean end of input.
+    The length is checked before reading, so a corrupt header cannot make us allocate GiBs.
+    Raises:
+        ValueError: If the input ends in the middle of a value or a value is longer than
+            _MAX_RECORD_BYTES.
+    '''
+    head=stream.read(4)
+    if not head:
+        return None
+    if len(head)<4:
+        raise ValueError("Truncated binary input")
+    size=int.from_bytes(head,'big')
+    if size>_MAX_RECORD_BYTES:
+        raise ValueError("Binary value of {} bytes exceeds the {} byte limit".format(size,_MAX_RECORD_BYTES))
+    body=stream.read(size)
+    if len(body)<size:
+        raise ValueError("Truncated binary input")
+    return int.from_bytes(body,'big',signed=True)
+
+def _read_binary(paths:list[str])->Iterator[tuple[int,int]]:
+    '''
+    Yield (numerator, denominator) records from each binary file in turn, "-" meaning stdin.
+    A record is two ints, each a 4-byte big-endian length followed by that many bytes of
+    signed big-endian two's complement.
+    '''
+    for path in paths:
+        stream=sys.stdin.buffer if path=='-' else open(path,'rb')
+        try:
+            while True:
+                n=_read_int(stream)
+                if n is None:
+                    break
+                d=_read_int(stream)
+                if d is None:
+                    raise ValueError("Truncated binary input")
+                yield n,d
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+def _write_binary(stream:BinaryIO,f:Fraction)->None:
+    '''
+    Write a Fraction as one binary record (see _read_binary).
+    '''
+    for x in f.to_tuple():
+        body=x.to_bytes(x.bit_length()//8+1,'big',signed=True)
+        stream.write(len(body).to_bytes(4,'big'))
+        stream.write(body)
+
+def _to_fraction(record:str|tuple[int,int],index:int)->Fraction:
+    '''
+    Convert a text line or binary pair to a Fraction.
+    Raises:
+        ValueError: If the record is not a valid fraction, naming its position.
+    '''
+    try:
+        if isinstance(record,str):
+            return Fraction.from_string(record)
+        return Fraction(*record)
+    except ValueError as e:
+        raise ValueError("record {}: {}".format(index+1,e)) from None
+
+def _chunks(records:Iterable,size:int)->Iterator[tuple[int,list]]:
+    '''
+    Group records into lists of at most size items, each tagged with its first record index.
+    '''
+    chunk:list=[]
+    start=0
+    for i,record in enumerate(records):
+        if not chunk:
+            start=i
+        chunk.append(record)
+        if len(chunk)==size:
+            yield start,chunk
+            chunk=[]
+    if chunk:
+        yield start,chunk
+
+def _reduce_chunk(op:str,reservoir:int,start:int,records:list)->Fraction|StreamingStats:
+    '''
+    Fold one chunk into a partial result for a sum, product or stats run.
+    '''
+    values=(_to_fraction(r,start+i) for i,r in enumerate(records))
+    if op=='stats':
+        return StreamingStats(reservoir).update(values)
+    if op=='sum':
+        num,den=0,1
+        for value in values:
+            num,den=_add_pairs(num,den,*value.to_tuple())
+        return Fraction(num,den)
+    result=Fraction(1)
+    for value in values:
+        result=result*value
+    return result
+
+def _map_chunk(op:str,digits:int,start:int,records:list)->list:
+    '''
+    Convert every record of one chunk for a reduce or decimal run.
+    '''
+    values=[_to_fraction(r,start+i) for i,r in enumerate(records)]
+    if op=='decimal':
+        return [v.to_decimal(digits) for v in values]
+    return values
+
+def _run_chunks(fn:Callable,chunks:Iterator[tuple[int,list]],jobs:int,*args:object)->Iterator:
+    '''
+    Apply fn(*args, start, chunk) to every chunk and yield the results in input order.
+    With jobs > 1 the chunks run in worker processes, keeping at most 2*jobs chunks in
+    flight so the input is still streamed.
+    '''
+    if jobs<=1:
+        for start,chunk in chunks:
+            yield fn(*args,start,chunk)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(jobs) as pool:
+        pending:deque=deque()
+        for start,chunk in chunks:
+            pending.append(pool.submit(fn,*args,start,chunk))
+            if len(pending)>=2*jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _build_parser()->argparse.ArgumentParser:
+    '''
+    Return the argument parser for the command-line calculator.
+    '''
+    import argparse
+    parser=argparse.ArgumentParser(prog='python -m fraction',
+                                   description='Batch calculator over streams of fractions, one per line ("3/4", "-1/2", "5").')
+    parser.add_argument('op',choices=_REDUCE_OPS+_MAP_OPS+('sort',),
+                        help='sum, product, stats, sort, reduce (normalize each value) or decimal (convert each value)')
+    parser.add_argument('files',nargs='*',default=['-'],help='input files, "-" or none for stdin')
+    parser.add_argument('-j','--jobs',type=int,default=1,help='worker processes (default 1)')
+    parser.add_argument('--chunk-size',type=int,default=10000,help='records per work unit (default 10000)')
+    parser.add_argument('--input-format',choices=('text','binary'),default='text')
+    parser.add_argument('--output-format',choices=('text','binary'),default='text')
+    parser.add_argument('--digits',type=int,default=10,help='digits after the point for decimal (default 10)')
+    parser.add_argument('--reservoir',type=int,default=0,help='sample size for stats quantiles (default 0: off)')
+    parser.add_argument('--profile',action='store_true',help='print timing and counts to stderr')
+    return parser
+
+def main(argv:list[str]|None=None)->int:
+    '''
+    Run the command-line batch calculator and return the exit status.
+    Sum, product, stats, reduce and decimal stream their input; sort holds every value in memory.
+    '''
+    import time
+    args=_build_parser().parse_intermixed_args(argv)
+    if args.jobs<1 or args.chunk_size<1:
+        print('error: --jobs and --chunk-size must be at least 1',file=sys.stderr)
+        return 2
+    if args.op in ('decimal','stats') and args.output_format=='binary':
+        print('error: {} output is text only'.format(args.op),file=sys.stderr)
+        return 2
+    started=time.perf_counter()
+    counted=[0]
+    def counting(records:Iterable)->Iterator:
+        for record in records:
+            counted[0]+=1
+            yield record
+    records=_read_binary(args.files) if args.input_format=='binary' else _read_text(args.files)
+    chunks=_chunks(counting(records),args.chunk_size)
+    binary=args.output_format=='binary'
+    out=sys.stdout.buffer if binary else sys.stdout
+    def emit(value:Fraction|str)->None:
+        if binary:
+            _write_binary(out,value)
+        else:
+            out.write('{}\n'.format(value))
+    try:
+        if args.op in _MAP_OPS:
+            for values in _run_chunks(_map_chunk,chunks,args.jobs,args.op,args.digits):
+                for value in values:
+                    emit(value)
+        elif args.op=='sort':
+            values=[]
+            for start,chunk in chunks:
+                values.extend(_map_chunk('reduce',0,start,chunk))
+            values.sort()
+            for value in values:
+                emit(value)
+        elif args.op=='stats':
+            stats=StreamingStats(args.reservoir)
+            for part in _run_chunks(_reduce_chunk,chunks,args.jobs,'stats',args.reservoir):
+                stats.merge(part)
+            out.write('count\t{}\n'.format(stats.count))
+            out.write('sum\t{}\n'.format(stats.total()))
+            if stats.count:
+                out.write('mean\t{}\n'.format(stats.mean()))
+                out.write('variance\t{}\n'.format(stats.variance()))
+                out.write('min\t{}\n'.format(stats.minimum))
+                out.write('max\t{}\n'.format(stats.maximum))
+                if args.reservoir:
+                    out.write('median\t{}\n'.format(stats.quantile(Fraction(1,2))))
+        else:
+            result=Fraction(0 if args.op=='sum' else 1)
+            for part in _run_chunks(_reduce_chunk,chunks,args.jobs,args.op,0):
+                result=result+part if args.op=='sum' else result*part
+            emit(result)
+    except (OSError,ValueError) as e:
+        print('error: {}'.format(e),file=sys.stderr)
+        return 1
+    out.flush()
+    if args.profile:
+        elapsed=time.perf_counter()-started
+        print('records\t{}'.format(counted[0]),file=sys.stderr)
+        print('jobs\t{}'.format(args.jobs),file=sys.stderr)
+        print('elapsed\t{:.3f}s'.format(elapsed),file=sys.stderr)
+        print('rate\t{:.0f} records/s'.format(counted[0]/elapsed if elapsed else 0),file=sys.stderr)
+    return 0
+
+
+if __name__=='__main__':
+    sys.exit(main())
@@ -1,6 +1,14 @@
 
+import asyncio
+import decimal
+import fractions
+import os
+import subprocess
+import sys
+import threading
 import pytest
-from fraction import Fraction
+from fraction import Fraction,OperationCache,BoundedDenominator,StreamingStats,RationalInterval,SparseRationalVector,main
+from fraction import determinant,multimodular,rational_reconstruct,solve
 # Construction & Normalization
 
 def test_basic_fraction():
@@ -307,6 +315,13 @@ def test_hash_consistency_with_float():
 
 def test_hash_consistency_with_int():
     assert hash(Fraction(2,1))==hash(2)
+    assert hash(Fraction(-1))==hash(-1)
+    assert hash(Fraction(2**80))==hash(2**80)
+
+def test_sorted_fractions():
+    xs=[Fraction(1,2),Fraction(-3,4),Fraction(1,3),Fraction(2,4),Fraction(0)]
+    assert sorted(xs)==[Fraction(-3,4),Fraction(0),Fraction(1,3),Fraction(1,2),Fraction(1,2)]
+    assert Fraction(1,2)<=Fraction(2,4) and not Fraction(1,2)!=Fraction(2,4)
 
 def test_hash_equal_fractions_same_hash():
     assert hash(Fraction(1,2))==hash(Fraction(2,4))
@@ -482,3 +497,724 @@ def test_unsupported_operand_add():
 def test_unsupported_operand_mul():
     with pytest.raises(TypeError):
         Fraction(1,2)*None
+
+# to_decimal
+
+def test_to_decimal_rounds_half_even():
+    assert Fraction(2,3).to_decimal(5)=="0.66667"
+
+def test_to_decimal_pads_leading_zeros():
+    assert Fraction(1,1000).to_decimal(4)=="0.0010"
+
+def test_to_decimal_negative():
+    assert Fraction(-7,4).to_decimal(1)=="-1.8"
+
+def test_to_decimal_zero_digits():
+    assert Fraction(5,2).to_decimal(0)=="2"
+
+def test_to_decimal_rounding_mode():
+    assert Fraction(5,2).to_decimal(0,decimal.ROUND_HALF_UP)=="3"
+    assert Fraction(-1,3).to_decimal(2,decimal.ROUND_FLOOR)=="-0.34"
+
+def test_to_decimal_huge_value_exact():
+    assert Fraction(10**40+1,10).to_decimal(1)=="1"+"0"*38+"0.1"
+
+def test_to_decimal_beyond_int_str_digit_limit():
+    s=Fraction(1,3).to_decimal(5000)
+    assert s=="0."+"3"*5000
+
+def test_to_decimal_huge_integer_part():
+    assert Fraction(10**5000+1,2).to_decimal(1)=="5"+"0"*4999+".5"
+
+def test_to_decimal_bad_digits_raises():
+    with pytest.raises(ValueError):
+        Fraction(1,3).to_decimal(-1)
+
+def test_to_decimal_bad_rounding_raises():
+    with pytest.raises(ValueError):
+        Fraction(1,3).to_decimal(2,"nearest")
+
+# to_repeating
+
+def test_to_repeating_mixed():
+    assert Fraction(1,6).to_repeating()=="0.1(6)"
+
+def test_to_repeating_pure():
+    assert Fraction(1,7).to_repeating()=="0.(142857)"
+
+def test_to_repeating_terminating():
+    assert Fraction(1,4).to_repeating()=="0.25"
+
+def test_to_repeating_whole_number():
+    assert Fraction(6,3).to_repeating()=="2"
+
+def test_to_repeating_negative():
+    assert Fraction(-7,6).to_repeating()=="-1.1(6)"
+
+def test_to_repeating_leading_zero_in_period():
+    assert Fraction(1,81).to_repeating()=="0.(012345679)"
+
+def test_to_repeating_period_beyond_int_str_digit_limit():
+    s=Fraction(1,10007).to_repeating()
+    assert s.startswith("0.(0000999")
+    assert len(s)==10006+4
+
+def test_to_repeating_large_prime_small_period():
+    assert Fraction(1,9091).to_repeating(max_period=10)=="0.(0001099989)"
+
+def test_to_repeating_period_over_cap_raises():
+    with pytest.raises(ValueError):
+        Fraction(1,7).to_repeating(max_period=5)
+
+def test_to_repeating_huge_period_raises_quickly():
+    with pytest.raises(ValueError):
+        Fraction(1,(2**31-1)*(2**61-1)).to_repeating()
+
+# __format__
+
+def test_format_fixed():
+    assert format(Fraction(1,3),".3f")=="0.333"
+
+def test_format_fixed_matches_float_options():
+    assert format(Fraction(-12345678,7),">16,.2f")==format(-12345678/7,">16,.2f")
+
+def test_format_exponent():
+    assert format(Fraction(1,3),".2e")=="3.33e-01"
+
+def test_format_exponent_rounds_up():
+    assert format(Fraction(999,1000),".1e")=="1.0e+00"
+
+def test_format_exponent_huge_value():
+    assert format(Fraction(10**400,3),".3e")=="3.333e+399"
+
+def test_format_fixed_beyond_int_str_digit_limit():
+    assert format(Fraction(1,3),".5000f")=="0."+"3"*5000
+
+def test_format_exponent_beyond_int_str_digit_limit():
+    assert format(Fraction(10**5000,3),".3e")=="3.333e+4999"
+    assert format(Fraction(1,3*10**5000),".3e")=="3.333e-5001"
+
+def test_format_percent():
+    assert format(Fraction(1,8),".1%")=="12.5%"
+
+def test_format_alternate_and_underscore_grouping():
+    assert format(Fraction(5,2),"#.0f")=="2."
+    assert format(Fraction(-1,100),"#.0e")=="-1.e-02"
+    assert format(Fraction(12345,2),"_.1f")=="6_172.5"
+
+def test_format_zero_padding_with_grouping_matches_float():
+    for spec in ("08,.0f","012_.1f","+011,.1f","0=12,.1f","012,.2e","z07,.0f","#.0%"):
+        for x in (Fraction(2469,2),Fraction(-1,100),Fraction(0)):
+            assert format(x,spec)==format(x.to_tuple()[0]/x.to_tuple()[1],spec)
+
+def test_format_no_type_uses_str():
+    assert format(Fraction(1,2),">5")=="  1/2"
+
+def test_format_unsupported_type_raises():
+    with pytest.raises(ValueError):
+        format(Fraction(1,2),".2g")
+
+# OperationCache
+
+def test_cache_counts_hits_and_misses():
+    with OperationCache(min_bits=0) as cache:
+        assert Fraction(1,2)*Fraction(2,3)==Fraction(1,3)
+        assert Fraction(1,2)*Fraction(2,3)==Fraction(1,3)
+    assert (cache.hits,cache.misses)==(1,1)
+
+def test_cache_separates_operators():
+    with OperationCache(min_bits=0) as cache:
+        assert Fraction(1,2)/Fraction(2,3)==Fraction(3,4)
+        assert Fraction(1,2)*Fraction(2,3)==Fraction(1,3)
+    assert cache.misses==2
+
+def test_cache_inactive_outside_block():
+    cache=OperationCache(min_bits=0)
+    with cache:
+        Fraction(1,2)*Fraction(1,2)
+    Fraction(1,2)*Fraction(1,2)
+    assert cache.stats()=={'hits':0,'misses':1,'evictions':0,'size':1}
+
+def test_cache_lru_eviction():
+    with OperationCache(maxsize=2,min_bits=0) as cache:
+        Fraction(1,2)*Fraction(1,3)
+        Fraction(1,2)*Fraction(1,5)
+        Fraction(1,2)*Fraction(1,3)
+        Fraction(1,2)*Fraction(1,7)
+        Fraction(1,2)*Fraction(1,3)
+    assert cache.evictions==1
+    assert cache.hits==2
+
+def test_cache_skips_large_operands():
+    with OperationCache(max_bits=8,min_bits=0) as cache:
+        Fraction(10**6,7)*Fraction(1,3)
+    assert len(cache)==0
+    assert cache.misses==0
+
+def test_cache_as_decorator():
+    cache=OperationCache(min_bits=0)
+    @cache
+    def square(x):
+        return x*x
+    square(Fraction(2,3))
+    assert square(Fraction(2,3))==Fraction(4,9)
+    assert cache.hits==1
+
+def _run_interleaved(mode,check):
+    async def task(entered,release,done):
+        try:
+            with mode:
+                check()
+                entered.set()
+                await release.wait()
+        finally:
+            entered.set()
+            done.set()
+    async def run():
+        events=[(asyncio.Event(),asyncio.Event(),asyncio.Event()) for _ in range(3)]
+        tasks=[asyncio.create_task(task(*e)) for e in events]
+        for entered,_,_ in events:
+            await entered.wait()
+        for _,release,done in events:
+            release.set()
+            await done.wait()
+        await asyncio.gather(*tasks)
+    asyncio.run(asyncio.wait_for(run(),5))
+
+def test_cache_shared_by_interleaved_tasks():
+    cache=OperationCache(min_bits=0)
+    _run_interleaved(cache,lambda: Fraction(1,2)*Fraction(2,3))
+    assert (cache.hits,cache.misses)==(2,1)
+    Fraction(1,2)*Fraction(2,3)
+    assert cache.hits==2
+
+def test_cache_shared_by_threads():
+    cache=OperationCache(maxsize=8,min_bits=0)
+    def work():
+        with cache:
+            for i in range(200):
+                Fraction(1,i%16+1)*Fraction(2,3)
+    threads=[threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.hits+cache.misses==800
+    assert len(cache)==8
+
+def test_cache_bypassed_for_word_sized_operands():
+    with OperationCache() as cache:
+        assert Fraction(3,7)*Fraction(5,11)==Fraction(15,77)
+        assert Fraction(3,7)/Fraction(5,11)==Fraction(33,35)
+    assert (cache.hits,cache.misses,len(cache))==(0,0,0)
+
+def test_cache_used_above_min_bits():
+    a=Fraction(3*2**100+1,7)
+    with OperationCache() as cache:
+        a*Fraction(5,11)
+        assert a*Fraction(5,11)==Fraction(15*2**100+5,77)
+    assert (cache.hits,cache.misses)==(1,1)
+
+def test_cache_bad_bit_limits_raise():
+    with pytest.raises(ValueError):
+        OperationCache(max_bits=8,min_bits=16)
+
+def test_cache_division_by_zero_still_raises():
+    with OperationCache(min_bits=0):
+        with pytest.raises(ZeroDivisionError):
+            Fraction(1,2)/Fraction(0)
+
+# Interop with numbers.Rational and Decimal
+
+def test_add_stdlib_fraction():
+    assert Fraction(1,2)+fractions.Fraction(1,3)==Fraction(5,6)
+
+def test_radd_stdlib_fraction_returns_fraction():
+    assert type(fractions.Fraction(1,3)+Fraction(1,2)) is Fraction
+
+def test_mul_decimal_exact():
+    assert Fraction(1,2)*decimal.Decimal("0.1")==Fraction(1,20)
+
+def test_rsub_decimal():
+    assert decimal.Decimal("1.5")-Fraction(1,2)==Fraction(1)
+
+def test_truediv_stdlib_fraction_zero_raises():
+    with pytest.raises(ZeroDivisionError):
+        Fraction(1,2)/fractions.Fraction(0)
+
+def test_rtruediv_stdlib_fraction():
+    assert fractions.Fraction(1,2)/Fraction(1,4)==Fraction(2)
+
+def test_compare_decimal_exact():
+    assert Fraction(1,10)==decimal.Decimal("0.1")
+    assert Fraction(1,3)<decimal.Decimal("0.34")
+
+def test_compare_int_exact_for_large_values():
+    assert Fraction(10**30+1)!=10**30
+    assert Fraction(10**30+1)>10**30
+
+def test_bool_operand_treated_as_int():
+    assert Fraction(1,2)+True==Fraction(3,2)
+
+def test_hash_matches_stdlib_fraction():
+    assert hash(Fraction(1,3))==hash(fractions.Fraction(1,3))
+    assert {fractions.Fraction(1,3):1}.get(Fraction(1,3))==1
+
+def test_hash_matches_large_int():
+    assert hash(Fraction(10**30+1))==hash(10**30+1)
+
+def test_hash_matches_decimal():
+    assert hash(Fraction(1,10))==hash(decimal.Decimal("0.1"))
+
+def test_hash_negative():
+    assert hash(Fraction(-1,3))==hash(fractions.Fraction(-1,3))
+    assert hash(Fraction(-1))==hash(-1)
+
+def test_compare_float_exact():
+    assert Fraction(1,3)!=1/3
+    assert Fraction(1,10)<0.1
+
+def test_compare_float_infinity_and_nan():
+    assert Fraction(10**400)<float("inf")
+    assert Fraction(-10**400)>float("-inf")
+    assert not Fraction(1,2)==float("nan")
+    assert Fraction(1,2)!=float("nan")
+
+def test_construct_from_decimal_and_stdlib_fraction():
+    assert Fraction(decimal.Decimal("1.25"))==Fraction(5,4)
+    assert Fraction(1,fractions.Fraction(2,3))==Fraction(3,2)
+
+def test_compare_decimal_nan():
+    assert (Fraction(1,2)==decimal.Decimal("NaN")) is False
+    assert (Fraction(1,2)!=decimal.Decimal("NaN")) is True
+    assert not Fraction(1,2)<decimal.Decimal("NaN")
+    assert not Fraction(1,2)>=decimal.Decimal("sNaN")
+
+def test_compare_decimal_infinity():
+    assert (Fraction(1,2)==decimal.Decimal("Infinity")) is False
+    assert Fraction(10**400)<decimal.Decimal("Infinity")
+    assert Fraction(-10**400)>decimal.Decimal("-Infinity")
+
+def test_arithmetic_with_non_finite_decimal_raises():
+    with pytest.raises(ValueError):
+        Fraction(1,2)+decimal.Decimal("Infinity")
+    with pytest.raises(ValueError):
+        Fraction(1,2)*decimal.Decimal("NaN")
+
+def test_construct_from_decimal_nan_raises():
+    with pytest.raises(ValueError):
+        Fraction(decimal.Decimal("NaN"))
+
+# limit_denominator
+
+def test_limit_denominator_nearest():
+    assert Fraction(3141592653,1000000000).limit_denominator(100)==Fraction(311,99)
+
+def test_limit_denominator_floor_and_ceiling():
+    x=Fraction(3141592653,1000000000)
+    assert x.limit_denominator(10,decimal.ROUND_FLOOR)==Fraction(25,8)
+    assert x.limit_denominator(10,decimal.ROUND_CEILING)==Fraction(22,7)
+
+def test_limit_denominator_toward_zero_negative():
+    assert Fraction(-1,3).limit_denominator(2,decimal.ROUND_DOWN)==Fraction(0)
+
+def test_limit_denominator_small_denominator_unchanged():
+    assert Fraction(2,3).limit_denominator(3)==Fraction(2,3)
+
+def test_limit_denominator_bad_bound_raises():
+    with pytest.raises(ValueError):
+        Fraction(1,3).limit_denominator(0)
+
+# BoundedDenominator
+
+def test_bounded_mode_caps_denominator():
+    with BoundedDenominator(100):
+        x=Fraction(0)
+        for i in range(1,30):
+            x=x+Fraction(1,i)
+    assert x.to_tuple()[1]<=100
+
+def test_bounded_mode_reports_error():
+    with BoundedDenominator(10) as mode:
+        Fraction(1,3)*Fraction(1,7)
+    assert mode.snapped==1
+    assert mode.error==mode.max_error==1/21
+
+def test_bounded_mode_direction():
+    with BoundedDenominator(10,decimal.ROUND_CEILING):
+        assert Fraction(1,3)*Fraction(1,7)==Fraction(1,10)
+    with BoundedDenominator(10,decimal.ROUND_FLOOR):
+        assert Fraction(1,3)*Fraction(1,7)==Fraction(0)
+
+def test_bounded_mode_exact_outside_block():
+    with BoundedDenominator(10):
+        pass
+    assert Fraction(1,3)*Fraction(1,7)==Fraction(1,21)
+
+def test_bounded_mode_shared_by_interleaved_tasks():
+    mode=BoundedDenominator(10)
+    results=[]
+    _run_interleaved(mode,lambda: results.append(Fraction(1,3)*Fraction(1,7)))
+    assert results==[Fraction(0)]*3
+    assert mode.snapped==3
+    assert Fraction(1,3)*Fraction(1,7)==Fraction(1,21)
+
+def test_bounded_mode_is_thread_local():
+    mode=BoundedDenominator(10)
+    seen=[]
+    with mode:
+        t=threading.Thread(target=lambda: seen.append(Fraction(1,3)*Fraction(1,7)))
+        t.start()
+        t.join()
+    assert seen==[Fraction(1,21)]
+
+def test_bounded_mode_not_served_from_cache():
+    with OperationCache(min_bits=0) as cache:
+        Fraction(1,3)*Fraction(1,7)
+        with BoundedDenominator(10,decimal.ROUND_CEILING):
+            assert Fraction(1,3)*Fraction(1,7)==Fraction(1,10)
+    assert cache.hits==0
+
+def test_cache_and_bounded_mode_exit_out_of_order():
+    cache=OperationCache(min_bits=0)
+    mode=BoundedDenominator(10)
+    cache.__enter__()
+    mode.__enter__()
+    cache.__exit__(None,None,None)
+    assert Fraction(1,3)*Fraction(1,7)==Fraction(0)
+    assert cache.misses==0
+    mode.__exit__(None,None,None)
+    assert Fraction(1,3)*Fraction(1,7)==Fraction(1,21)
+    assert cache.misses==0
+
+def test_exit_without_enter_raises():
+    with pytest.raises(RuntimeError):
+        BoundedDenominator(10).__exit__(None,None,None)
+
+# StreamingStats
+
+def test_stats_mean_and_total():
+    s=StreamingStats().update([Fraction(1,2),Fraction(1,3),1])
+    assert s.total()==Fraction(11,6)
+    assert s.mean()==Fraction(11,18)
+
+def test_stats_variance_population_and_sample():
+    s=StreamingStats().update([1,2,3,4])
+    assert s.variance()==Fraction(5,4)
+    assert s.variance(sample=True)==Fraction(5,3)
+
+def test_stats_min_max():
+    s=StreamingStats().update([Fraction(1,2),Fraction(-1,3),Fraction(2,5)])
+    assert (s.minimum,s.maximum)==(Fraction(-1,3),Fraction(1,2))
+
+def test_stats_merge_matches_single_pass():
+    values=[Fraction(i,i%5+1) for i in range(1,40)]
+    whole=StreamingStats().update(values)
+    left=StreamingStats().update(values[:13])
+    left.merge(StreamingStats().update(values[13:]))
+    assert left.count==whole.count
+    assert left.mean()==whole.mean()
+    assert left.variance()==whole.variance()
+    assert (left.minimum,left.maximum)==(whole.minimum,whole.maximum)
+
+def test_stats_quantile_exact_when_reservoir_holds_all():
+    s=StreamingStats(reservoir_size=10).update([4,1,3,2])
+    assert s.quantile(Fraction(1,2))==Fraction(5,2)
+    assert s.quantile(0)==1
+    assert s.quantile(1)==4
+
+def test_stats_reservoir_bounded():
+    s=StreamingStats(reservoir_size=5,seed=1).update(range(100))
+    assert len(s._reservoir)==5
+    assert 0<=s.quantile(Fraction(1,2))<=99
+
+def test_stats_quantile_without_reservoir_raises():
+    with pytest.raises(ValueError):
+        StreamingStats().update([1]).quantile(Fraction(1,2))
+
+def test_stats_empty_mean_raises():
+    with pytest.raises(ValueError):
+        StreamingStats().mean()
+
+# Command-line calculator
+
+def _write_input(tmp_path,text):
+    path=tmp_path/"input.txt"
+    path.write_text(text)
+    return str(path)
+
+def test_cli_sum(tmp_path,capsys):
+    assert main(["sum",_write_input(tmp_path,"1/2\n1/3\n\n1\n")])==0
+    assert capsys.readouterr().out=="11/6\n"
+
+def test_cli_sum_parallel_matches_serial(tmp_path,capsys):
+    path=_write_input(tmp_path,"".join("{}/{}\n".format(i,i%7+1) for i in range(200)))
+    main(["sum",path])
+    serial=capsys.readouterr().out
+    main(["sum",path,"--jobs","2","--chunk-size","16"])
+    assert capsys.readouterr().out==serial
+
+def test_cli_sort_and_decimal(tmp_path,capsys):
+    path=_write_input(tmp_path,"1/2\n-1\n1/3\n")
+    main(["sort",path])
+    assert capsys.readouterr().out=="-1\n1/3\n1/2\n"
+    main(["decimal",path,"--digits","2"])
+    assert capsys.readouterr().out=="0.50\n-1.00\n0.33\n"
+
+def test_cli_stats(tmp_path,capsys):
+    main(["stats",_write_input(tmp_path,"1\n2\n3\n4\n")])
+    out=capsys.readouterr().out
+    assert "mean\t5/2\n" in out
+    assert "variance\t5/4\n" in out
+
+def test_cli_binary_round_trip(tmp_path,capsysbinary):
+    main(["reduce",_write_input(tmp_path,"2/4\n-1000\n"),"--output-format","binary"])
+    data=capsysbinary.readouterr().out
+    binary=tmp_path/"values.bin"
+    binary.write_bytes(data)
+    main(["sum",str(binary),"--input-format","binary"])
+    assert capsysbinary.readouterr().out==b"-1999/2\n"
+
+def test_cli_binary_oversized_record_rejected(tmp_path,capsys):
+    binary=tmp_path/"values.bin"
+    binary.write_bytes((2**32-1).to_bytes(4,'big')+b"\x01")
+    assert main(["sum",str(binary),"--input-format","binary"])==1
+    assert "exceeds" in capsys.readouterr().err
+
+def test_cli_invalid_record_reports_position(tmp_path,capsys):
+    assert main(["sum",_write_input(tmp_path,"1/2\nabc\n")])==1
+    assert "record 2" in capsys.readouterr().err
+
+def test_cli_profile_prints_counts(tmp_path,capsys):
+    main(["product",_write_input(tmp_path,"1/2\n2/3\n"),"--profile"])
+    captured=capsys.readouterr()
+    assert captured.out=="1/3\n"
+    assert "records\t2\n" in captured.err
+
+def test_import_skips_cli_and_process_modules():
+    code="import sys, fraction; print(sorted({'argparse','concurrent.futures','random'}&set(sys.modules)))"
+    out=subprocess.run([sys.executable,"-c",code],cwd=os.path.dirname(os.path.abspath(__file__)),
+                       capture_output=True,text=True,check=True).stdout
+    assert out=="[]\n"
+
+# Multi-modular linear algebra
+
+def test_rational_reconstruct_recovers_fraction():
+    m=2**61-1
+    assert rational_reconstruct(-3*pow(7,-1,m)%m,m)==Fraction(-3,7)
+
+def test_rational_reconstruct_none_when_too_large():
+    assert rational_reconstruct(12345,101) is None
+
+def test_determinant_integers():
+    assert determinant([[2,0,1],[1,3,2],[1,1,2]])==Fraction(6)
+
+def test_determinant_fractions():
+    assert determinant([[Fraction(1,2),1],[3,4]])==Fraction(-1)
+
+def test_determinant_singular_is_zero():
+    assert determinant([[1,2],[2,4]])==0
+
+def test_determinant_large_entries():
+    assert determinant([[10**30+1,10**30],[10**30,10**30-1]])==-1
+
+def test_multimodular_custom_task():
+    assert multimodular(lambda p:[pow(3,-1,p),5%p])==[Fraction(1,3),Fraction(5)]
+
+def test_solve_fractions():
+    a=[[Fraction(1,2),Fraction(1,3)],[Fraction(1,4),-1]]
+    b=[Fraction(1),Fraction(1,6)]
+    x=solve(a,b)
+    assert a[0][0]*x[0]+a[0][1]*x[1]==b[0]
+    assert a[1][0]*x[0]+a[1][1]*x[1]==b[1]
+
+def test_rational_reconstruct_with_bounds():
+    m=2**61-1
+    assert rational_reconstruct(-123456789%m,m,10**9,1)==Fraction(-123456789)
+    assert rational_reconstruct(-123456789%m,m,10**8,1) is None
+
+def test_multimodular_with_bound_stops_early():
+    primes=[]
+    assert multimodular(lambda p:primes.append(p) or [pow(3,-1,p)],bound=(1,3))==[Fraction(1,3)]
+    assert len(primes)==1
+
+def test_multimodular_with_bound_reports_unlucky():
+    with pytest.raises(ValueError):
+        multimodular(lambda p:None,bound=(1,2**200))
+
+def test_solve_parallel_matches_serial():
+    a=[[(i*7+j*3)%11-5+(i==j)*20 for j in range(6)] for i in range(6)]
+    b=list(range(6))
+    assert solve(a,b,jobs=2,method='modular')==solve(a,b)
+
+def test_determinant_methods_agree():
+    a=[[(i*i+3*j)%13-6+Fraction(1,i+1) for j in range(7)] for i in range(7)]
+    assert determinant(a,method='modular')==determinant(a,method='bareiss')==determinant(a)
+
+def test_solve_methods_agree():
+    a=[[(i*5+j*j)%17-8+(i==j)*Fraction(1,3) for j in range(7)] for i in range(7)]
+    b=[Fraction(i,i+2) for i in range(7)]
+    x=solve(a,b,method='bareiss')
+    assert solve(a,b,method='modular')==x
+    assert all(sum((u*v for u,v in zip(row,x)),Fraction(0))==bi for row,bi in zip(a,b))
+
+def test_solve_recomputes_when_modular_result_fails_check(monkeypatch):
+    monkeypatch.setattr("fraction._solve_mod",lambda p,rows,rhs:[1]*len(rows))
+    assert solve([[2,1],[1,3]],[Fraction(1,2),1],method='modular')==[Fraction(1,10),Fraction(3,10)]
+
+def test_solve_regular_matrix_with_unlucky_prime():
+    p=2**62-57
+    assert solve([[p,0],[0,1]],[1,1],method='modular')==[Fraction(1,p),Fraction(1)]
+
+def test_solve_unknown_method_raises():
+    with pytest.raises(ValueError):
+        solve([[1]],[1],method='gauss')
+
+def test_solve_singular_raises():
+    for method in ('bareiss','modular'):
+        with pytest.raises(ValueError,match="singular"):
+            solve([[1,2],[2,4]],[1,1],method=method)
+        with pytest.raises(ValueError,match="singular"):
+            solve([[1,2,3],[4,5,6],[7,8,9]],[1,2,3],method=method)
+
+def test_determinant_not_square_raises():
+    with pytest.raises(ValueError):
+        determinant([[1,2]])
+
+# RationalInterval
+
+def test_interval_point():
+    assert RationalInterval(Fraction(1,3)).lower==Fraction(1,3)
+
+def test_interval_outward_rounding_contains_exact_result():
+    x=RationalInterval(Fraction(1,3),max_denominator=10)*Fraction(1,7)
+    assert (x.lower,x.upper)==(Fraction(0),Fraction(1,10))
+    assert Fraction(1,21) in x
+
+def test_interval_denominators_stay_bounded():
+    x=RationalInterval(1,max_denominator=1000)
+    for i in range(2,40):
+        x=x+RationalInterval(Fraction(1,i),max_denominator=1000)
+    assert x.lower.to_tuple()[1]<=1000
+    assert x.upper.to_tuple()[1]<=1000
+    assert sum(Fraction(1,i) for i in range(1,40)) in x
+
+def test_interval_exact_endpoints():
+    x=RationalInterval(Fraction(1,3),max_denominator=None)*Fraction(1,7)
+    assert x==RationalInterval(Fraction(1,21),max_denominator=None)
+
+def test_interval_with_bound_switches_to_exact():
+    assert RationalInterval(1,2).with_bound(None).max_denominator is None
+
+def test_interval_subtraction_and_negation():
+    x=RationalInterval(1,2)
+    assert 3-x==RationalInterval(1,2)
+    assert -x==RationalInterval(-2,-1)
+
+def test_interval_multiplication_mixed_signs():
+    assert RationalInterval(-1,2)*RationalInterval(-3,1)==RationalInterval(-6,3)
+
+def test_interval_division():
+    assert RationalInterval(1,2)/RationalInterval(3,4)==RationalInterval(Fraction(1,4),Fraction(2,3))
+
+def test_interval_division_by_zero_interval_raises():
+    with pytest.raises(ZeroDivisionError):
+        RationalInterval(1,2)/RationalInterval(-1,1)
+
+def test_interval_comparison_is_certain():
+    assert RationalInterval(1,2)<RationalInterval(3,4)
+    assert not RationalInterval(1,3)<RationalInterval(2,4)
+    assert not RationalInterval(1,3)>RationalInterval(2,4)
+
+def test_interval_equals_scalar_point():
+    assert RationalInterval(3)==3
+    assert RationalInterval(Fraction(1,3))==Fraction(1,3)
+    assert Fraction(1,3)==RationalInterval(Fraction(1,3))
+    assert RationalInterval(1,2)!=1
+    assert RationalInterval(1)!=1.0
+    assert RationalInterval(Fraction(1,2**40))!=Fraction(1,2**40)
+    assert {RationalInterval(3):"x"}[3]=="x"
+    assert hash(RationalInterval(Fraction(1,3)))==hash(Fraction(1,3))
+
+def test_interval_ignores_bounded_mode():
+    with BoundedDenominator(2):
+        x=RationalInterval(Fraction(1,3),max_denominator=None)+Fraction(1,5)
+    assert x.lower==Fraction(8,15)
+
+def test_interval_float_endpoint_raises():
+    with pytest.raises(TypeError):
+        RationalInterval(0.1)
+
+def test_interval_reversed_endpoints_raises():
+    with pytest.raises(ValueError):
+        RationalInterval(2,1)
+
+# SparseRationalVector
+
+def test_sparse_from_dict_drops_zeros():
+    v=SparseRationalVector.from_dict({0:Fraction(1,2),4:0,9:3})
+    assert len(v)==2
+    assert v[4]==0
+    assert v[9]==3
+
+def test_sparse_from_columns_sums_repeats():
+    v=SparseRationalVector.from_columns([3,7,3],[1,1,1],[6,2,6])
+    assert v.to_dict()=={3:Fraction(1,3),7:Fraction(1,2)}
+
+def test_sparse_from_columns_length_mismatch_raises():
+    with pytest.raises(ValueError):
+        SparseRationalVector.from_columns([1,2],[1])
+
+def test_sparse_from_columns_zero_denominator_raises():
+    with pytest.raises(ValueError):
+        SparseRationalVector.from_columns([1],[1],[0])
+
+def test_sparse_from_columns_non_integral_raises():
+    with pytest.raises(TypeError):
+        SparseRationalVector.from_columns([0],[1.5],[2.7])
+    with pytest.raises(TypeError):
+        SparseRationalVector.from_columns([0],[1],[2.0])
+
+def test_sparse_from_columns_non_int_index_raises():
+    with pytest.raises(TypeError):
+        SparseRationalVector.from_columns(["a"],[1])
+    with pytest.raises(TypeError):
+        SparseRationalVector.from_columns([1.0],[1])
+    with pytest.raises(TypeError):
+        SparseRationalVector({1.0:1})
+
+class _Index:
+    def __init__(self,value):
+        self.value=value
+    def __index__(self):
+        return self.value
+
+def test_sparse_accepts_index_types():
+    v=SparseRationalVector.from_columns([_Index(3),_Index(3),_Index(5)],[1,1,2],[2,2,3])
+    assert v.to_dict()=={3:Fraction(1),5:Fraction(2,3)}
+    assert type(next(iter(v.to_dict())))==int
+    assert SparseRationalVector({_Index(4):Fraction(1,2)})[4]==Fraction(1,2)
+
+def test_sparse_dot():
+    a=SparseRationalVector({0:Fraction(1,2),3:Fraction(2,3),7:5})
+    b=SparseRationalVector({3:Fraction(1,3),7:Fraction(1,2),9:4})
+    assert a.dot(b)==Fraction(49,18)
+    assert a@b==b@a
+
+def test_sparse_dot_matches_fraction_loop():
+    a={i:Fraction(i+1,i%4+2) for i in range(0,60,2)}
+    b={i:Fraction(i-7,i%3+5) for i in range(0,60,3)}
+    expected=sum((a[i]*b[i] for i in a if i in b),Fraction(0))
+    assert SparseRationalVector(a).dot(SparseRationalVector(b))==expected
+
+def test_sparse_add_and_sub():
+    a=SparseRationalVector({1:Fraction(1,2),2:1})
+    b=SparseRationalVector({1:Fraction(1,2),3:Fraction(1,4)})
+    assert (a+b).to_dict()=={1:1,2:1,3:Fraction(1,4)}
+    assert len(a-a)==0
+
+def test_sparse_scale():
+    v=SparseRationalVector({1:Fraction(2,3)})
+    assert (v*Fraction(3,4)).to_dict()=={1:Fraction(1,2)}
+    assert 2*v==v.scale(2)
+    assert len(v.scale(0))==0